@@ -99,6 +99,7 @@ setup(
     extras_require={
         'cors': ['flask-cors>=2.0.0'],
         'console_log': ['console_log==0.2.10'],
+        'orjson': ['orjson>=3.0.0'],
     },
     author='Maxime Beauchemin',
     author_email='maximebeauchemin@gmail.com',
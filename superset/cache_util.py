@@ -15,19 +15,30 @@ def view_cache_key(*unused_args, **unused_kwargs):
     return 'view/{}/{}'.format(request.path, args_hash)
 
 
-def memoized_func(timeout=5 * 60, key=view_cache_key):
+def memoized_func(timeout=5 * 60, key=view_cache_key, attribute_in_key=None):
     """Use this decorator to cache functions that have predefined first arg.
 
     memoized_func uses simple_cache and stored the data in memory.
     Key is a callable function that takes function arguments and
-    returns the caching key.
+    returns the caching key. When attribute_in_key is set, that attribute
+    of the first arg is passed to key ahead of the arguments, so instance
+    methods can be cached per instance. Instances where that attribute is
+    None aren't cached.
     """
     def wrap(f):
         if tables_cache:
             def wrapped_f(cls, *args, **kwargs):
-                cache_key = key(*args, **kwargs)
+                if attribute_in_key:
+                    attribute = getattr(cls, attribute_in_key)
+                    if attribute is None:
+                        # e.g. an object that isn't saved yet has no id,
+                        # don't share one cache entry between all of them
+                        return f(cls, *args, **kwargs)
+                    cache_key = key(attribute, *args, **kwargs)
+                else:
+                    cache_key = key(*args, **kwargs)
                 o = tables_cache.get(cache_key)
-                if not kwargs['force'] and o is not None:
+                if not kwargs.get('force') and o is not None:
                     return o
                 o = f(cls, *args, **kwargs)
                 tables_cache.set(cache_key, o, timeout=timeout)
@@ -43,6 +43,8 @@ ROW_LIMIT = 50000
 VIZ_ROW_LIMIT = 10000
 # max rows retrieved by filter select auto complete
 FILTER_SELECT_ROW_LIMIT = 10000
+# seconds filter select values are cached for, when a cache is configured
+FILTER_SELECT_CACHE_TIMEOUT = 60 * 5
 SUPERSET_WORKERS = 2  # deprecated
 SUPERSET_CELERY_WORKERS = 32  # deprecated
 
@@ -185,6 +187,10 @@ IMG_UPLOAD_URL = '/static/uploads/'
 CACHE_DEFAULT_TIMEOUT = 60 * 60 * 24
 CACHE_CONFIG = {'CACHE_TYPE': 'null'}
 TABLE_NAMES_CACHE_CONFIG = {'CACHE_TYPE': 'null'}
+# Seconds SQL Lab reuses a database's schema, table and view names for
+TABLE_NAMES_CACHE_TIMEOUT = 60
+# Number of charts /superset/warm_up_cache/ refreshes concurrently
+WARM_UP_CACHE_WORKERS = 4
 
 # CORS Options
 ENABLE_CORS = False
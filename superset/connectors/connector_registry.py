@@ -5,6 +5,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import defaultdict
+
 from sqlalchemy.orm import subqueryload
 
 
@@ -24,11 +26,38 @@ class ConnectorRegistry(object):
 
     @classmethod
     def get_datasource(cls, datasource_type, datasource_id, session):
-        return (
-            session.query(cls.sources[datasource_type])
-            .filter_by(id=datasource_id)
-            .first()
-        )
+        if datasource_id is None:
+            return None
+        # get() is served from the identity map when already loaded, as
+        # when slice_json resolves the slice's datasource then the viz's
+        return session.query(cls.sources[datasource_type]).get(datasource_id)
+
+    @classmethod
+    def get_datasources_by_key(cls, session, keys, eager=False):
+        """Loads datasources from ``(datasource_type, datasource_id)`` keys
+
+        Issues one query per datasource type and returns a dict mapping each
+        key found to its datasource. With ``eager``, columns and metrics are
+        loaded along with them, as ``get_eager_datasource`` does.
+        """
+        ids_by_type = defaultdict(set)
+        for datasource_type, datasource_id in keys:
+            ids_by_type[datasource_type].add(datasource_id)
+        datasources = {}
+        for datasource_type, datasource_ids in ids_by_type.items():
+            source_class = cls.sources[datasource_type]
+            qry = (
+                session.query(source_class)
+                .filter(source_class.id.in_(datasource_ids))
+            )
+            if eager:
+                qry = qry.options(
+                    subqueryload(source_class.columns),
+                    subqueryload(source_class.metrics),
+                )
+            for datasource in qry.all():
+                datasources[(datasource_type, datasource.id)] = datasource
+        return datasources
 
     @classmethod
     def get_all_datasources(cls, session):
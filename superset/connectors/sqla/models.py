@@ -763,14 +763,17 @@ class SqlaTable(Model, BaseDatasource):
     def get_sqla_table_object(self):
         return self.database.get_table(self.table_name, schema=self.schema)
 
-    def fetch_metadata(self):
-        """Fetches the metadata for the table and merges it in"""
-        try:
-            table = self.get_sqla_table_object()
-        except Exception:
-            raise Exception(_(
-                "Table [{}] doesn't seem to exist in the specified database, "
-                "couldn't fetch column information").format(self.table_name))
+    def fetch_metadata(self, table=None):
+        """Fetches the metadata for the table and merges it in
+
+        ``table`` is the already reflected sqlalchemy Table, if any"""
+        if table is None:
+            try:
+                table = self.get_sqla_table_object()
+            except Exception:
+                raise Exception(_(
+                    "Table [{}] doesn't seem to exist in the specified database, "
+                    "couldn't fetch column information").format(self.table_name))
 
         M = SqlMetric  # noqa
         metrics = []
@@ -779,8 +782,8 @@ class SqlaTable(Model, BaseDatasource):
         dbcols = (
             db.session.query(TableColumn)
             .filter(TableColumn.table == self)
-            .filter(or_(TableColumn.column_name == col.name
-                        for col in table.columns)))
+            .filter(TableColumn.column_name.in_(
+                [col.name for col in table.columns])))
         dbcols = {dbcol.column_name: dbcol for dbcol in dbcols}
 
         for col in table.columns:
@@ -6,6 +6,8 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import defaultdict
+
 from flask import flash, Markup, redirect
 from flask_appbuilder import CompactCRUDMixin, expose
 from flask_appbuilder.actions import action
@@ -14,13 +16,16 @@ from flask_appbuilder.security.decorators import has_access
 from flask_babel import gettext as __
 from flask_babel import lazy_gettext as _
 from past.builtins import basestring
+from sqlalchemy.orm import joinedload
 
 from superset import appbuilder, db, security_manager, utils
 from superset.connectors.base.views import DatasourceModelView
 from superset.views.base import (
     DatasourceFilter, DeleteMixin, get_datasource_exist_error_mgs,
-    ListWidgetWithCheckboxes, SupersetModelView, YamlExportMixin,
+    ListWidgetWithCheckboxes, SupersetModelView, SupersetSQLAInterface,
+    YamlExportMixin,
 )
+from superset.views.utils import clear_select_star_cache
 from . import models
 
 
@@ -152,7 +157,12 @@ appbuilder.add_view_no_menu(SqlMetricInlineView)
 
 
 class TableModelView(DatasourceModelView, DeleteMixin, YamlExportMixin):  # noqa
-    datamodel = SQLAInterface(models.SqlaTable)
+    datamodel = SupersetSQLAInterface(
+        models.SqlaTable,
+        list_load_options=(
+            joinedload(models.SqlaTable.database),
+            joinedload(models.SqlaTable.changed_by),
+        ))
 
     list_title = _('List Tables')
     show_title = _('Show Table')
@@ -253,10 +263,17 @@ class TableModelView(DatasourceModelView, DeleteMixin, YamlExportMixin):  # noqa
                 raise Exception(
                     get_datasource_exist_error_mgs(table.full_name))
 
-        # Fail before adding if the table can't be found
+        # Fail before adding if the table can't be found, has_table asks the
+        # database about that one table rather than reflecting its columns
         try:
-            table.get_sqla_table_object()
+            try:
+                table_exists = table.database.has_table(table)
+            except NotImplementedError:
+                table.get_sqla_table_object()
+                table_exists = True
         except Exception:
+            table_exists = False
+        if not table_exists:
             raise Exception(_(
                 'Table [{}] could not be found, '
                 'please double check your '
@@ -265,6 +282,8 @@ class TableModelView(DatasourceModelView, DeleteMixin, YamlExportMixin):  # noqa
 
     def post_add(self, table, flash_message=True):
         table.fetch_metadata()
+        clear_select_star_cache(table)
+        table.database.clear_table_names_cache([table.schema or None])
         security_manager.merge_perm('datasource_access', table.get_perm())
         if table.schema:
             security_manager.merge_perm('schema_access', table.schema_perm)
@@ -299,8 +318,18 @@ class TableModelView(DatasourceModelView, DeleteMixin, YamlExportMixin):  # noqa
     def refresh(self, tables):
         if not isinstance(tables, list):
             tables = [tables]
+        # Reflect the tables sharing a database and schema together
+        groups = defaultdict(list)
         for t in tables:
-            t.fetch_metadata()
+            groups[(t.database, t.schema)].append(t)
+        for (database, schema), group in groups.items():
+            sqla_tables = {}
+            if len(group) > 1:
+                sqla_tables = database.get_tables(
+                    [t.table_name for t in group], schema=schema)
+            for t in group:
+                t.fetch_metadata(sqla_tables.get(t.table_name))
+                clear_select_star_cache(t)
         msg = _(
             'Metadata refreshed for the following table(s): %(tables)s',
             tables=', '.join([t.table_name for t in tables]))
@@ -139,14 +139,12 @@ class BaseEngineSpec(object):
 
     @staticmethod
     def csv_to_df(**kwargs):
-        kwargs['filepath_or_buffer'] = \
-            config['UPLOAD_FOLDER'] + kwargs['filepath_or_buffer']
         kwargs['encoding'] = 'utf-8'
-        kwargs['iterator'] = True
-        chunks = pandas.read_csv(**kwargs)
-        df = pandas.DataFrame()
-        df = pandas.concat(chunk for chunk in chunks)
-        return df
+        # Map the file in one pass rather than concatenating chunks, which
+        # holds the whole frame twice and infers dtypes chunk by chunk
+        kwargs['memory_map'] = True
+        kwargs['low_memory'] = False
+        return pandas.read_csv(**kwargs)
 
     @staticmethod
     def df_to_db(df, table, **kwargs):
@@ -158,7 +156,7 @@ class BaseEngineSpec(object):
         db.session.commit()
 
     @staticmethod
-    def create_table_from_csv(form, table):
+    def create_table_from_csv(form, table, path):
         def _allowed_file(filename):
             # Only allow specific file extensions as specified in the config
             extension = os.path.splitext(filename)[1]
@@ -168,7 +166,7 @@ class BaseEngineSpec(object):
         if not _allowed_file(filename):
             raise Exception('Invalid file type selected')
         kwargs = {
-            'filepath_or_buffer': filename,
+            'filepath_or_buffer': path,
             'sep': form.sep.data,
             'header': form.header.data if form.header.data else 0,
             'index_col': form.index_col.data,
@@ -179,7 +177,6 @@ class BaseEngineSpec(object):
             'skip_blank_lines': form.skip_blank_lines.data,
             'parse_dates': form.parse_dates.data,
             'infer_datetime_format': form.infer_datetime_format.data,
-            'chunksize': 10000,
         }
         df = BaseEngineSpec.csv_to_df(**kwargs)
 
@@ -995,7 +992,7 @@ class HiveEngineSpec(PrestoEngineSpec):
         return super(HiveEngineSpec, cls).fetch_data(cursor, limit)
 
     @staticmethod
-    def create_table_from_csv(form, table):
+    def create_table_from_csv(form, table, path):
         """Uploads a csv file and creates a superset datasource in Hive."""
         def convert_to_hive_type(col_type):
             """maps tableschema's types to hive types"""
@@ -1029,10 +1026,7 @@ class HiveEngineSpec(PrestoEngineSpec):
         filename = form.csv_file.data.filename
         upload_prefix = config['CSV_TO_HIVE_UPLOAD_DIRECTORY']
 
-        upload_path = config['UPLOAD_FOLDER'] + \
-            secure_filename(form.csv_file.data.filename)
-
-        hive_table_schema = Table(upload_path).infer()
+        hive_table_schema = Table(path).infer()
         column_name_and_type = []
         for column_info in hive_table_schema['fields']:
             column_name_and_type.append(
@@ -1043,7 +1037,7 @@ class HiveEngineSpec(PrestoEngineSpec):
         s3 = boto3.client('s3')
         location = os.path.join('s3a://', bucket_path, upload_prefix, table_name)
         s3.upload_file(
-            upload_path, bucket_path,
+            path, bucket_path,
             os.path.join(upload_prefix, table_name, filename))
         sql = """CREATE TABLE {table_name} ( {schema_definition} )
             ROW FORMAT DELIMITED FIELDS TERMINATED BY ',' STORED AS
@@ -0,0 +1,74 @@
+"""add trigram indexes for substring search
+
+Revision ID: c82ee8a39623
+Revises: bddc498dd179
+Create Date: 2018-07-02 10:12:31.418301
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = 'c82ee8a39623'
+down_revision = 'bddc498dd179'
+
+import logging
+
+from alembic import op
+from sqlalchemy.exc import DBAPIError
+
+# Columns searched with unanchored '%substr%' LIKE / ILIKE patterns, which
+# a btree index can't serve. Only Postgres' pg_trgm GIN indexes can.
+# query.sql is left out, SQL Lab writes to it on every query and its
+# indexes would cost more than the search they speed up
+TRGM_INDEXES = [
+    ('ix_dbs_database_name_trgm', 'dbs', 'database_name'),
+    ('ix_ab_user_username_trgm', 'ab_user', 'username'),
+]
+
+
+def has_pg_trgm(bind):
+    """Makes sure pg_trgm is installed, when the role is allowed to"""
+    if bind.execute(
+            "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'").scalar():
+        return True
+    if not bind.execute(
+            'SELECT 1 FROM pg_available_extensions '
+            "WHERE name = 'pg_trgm'").scalar():
+        return False
+    # Creating an extension takes more privileges than the application's
+    # role usually has, a savepoint keeps the failure from aborting the
+    # migration's transaction
+    savepoint = bind.begin_nested()
+    try:
+        bind.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DBAPIError as e:
+        savepoint.rollback()
+        logging.warning(str(e))
+        return False
+    savepoint.commit()
+    return True
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    if not has_pg_trgm(bind):
+        logging.warning(
+            'The pg_trgm extension is missing and could not be created, '
+            'skipping the trigram indexes. Run CREATE EXTENSION pg_trgm '
+            'as a superuser and create them by hand to add them later.')
+        return
+    for index_name, table_name, column_name in TRGM_INDEXES:
+        op.create_index(
+            index_name, table_name, [column_name], unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column_name: 'gin_trgm_ops'})
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    # The indexes are only there when pg_trgm was
+    for index_name, _, _ in TRGM_INDEXES:
+        op.execute('DROP INDEX IF EXISTS {}'.format(index_name))
@@ -33,7 +33,9 @@ from sqlalchemy.schema import UniqueConstraint
 from sqlalchemy_utils import EncryptedType
 import sqlparse
 
-from superset import app, db, db_engine_specs, security_manager, utils
+from superset import (
+    app, cache_util, db, db_engine_specs, security_manager, tables_cache, utils,
+)
 from superset.connectors.connector_registry import ConnectorRegistry
 from superset.models.helpers import AuditMixinNullable, ImportMixin, set_perm
 from superset.viz import viz_types
@@ -43,19 +45,47 @@ from urllib import parse  # noqa
 config = app.config
 custom_password_store = config.get('SQLALCHEMY_CUSTOM_PASSWORD_STORE')
 stats_logger = config.get('STATS_LOGGER')
+DB_CONNECTION_MUTATOR = config.get('DB_CONNECTION_MUTATOR')
 metadata = Model.metadata  # pylint: disable=no-member
 
 PASSWORD_MASK = 'X' * 10
+TABLE_NAMES_CACHE_TIMEOUT = config.get('TABLE_NAMES_CACHE_TIMEOUT')
 
 def set_related_perm(mapper, connection, target):  # noqa
     src_class = target.cls_model
     id_ = target.datasource_id
     if id_:
-        ds = db.session.query(src_class).filter_by(id=int(id_)).first()
+        ds = db.session.query(src_class).get(int(id_))
         if ds:
             target.perm = ds.perm
 
 
+def table_names_cache_key(db_id, schema=None, **kwargs):
+    return 'db:{}:schema:{}:table_list'.format(db_id, schema)
+
+
+def view_names_cache_key(db_id, schema=None, **kwargs):
+    return 'db:{}:schema:{}:view_list'.format(db_id, schema)
+
+
+def get_explore_url(
+        slice_id, base_url='/superset/explore', overrides=None):
+    form_data = {'slice_id': slice_id}
+    form_data.update(overrides or {})
+    params = parse.quote(json.dumps(form_data))
+    return '{base_url}/?form_data={params}'.format(
+        base_url=base_url, params=params)
+
+
+@utils.memoized
+def get_backend_name(sqlalchemy_uri):
+    """Returns the backend name of a (possibly password masked) URI
+
+    Parsing URIs is relatively expensive and there are only a handful of
+    distinct ones, so results are memoized"""
+    return make_url(sqlalchemy_uri).get_backend_name()
+
+
 class Url(Model, AuditMixinNullable):
     """Used for the short url feature"""
 
@@ -134,11 +164,10 @@ class Slice(Model, AuditMixinNullable, ImportMixin):
     @datasource.getter
     @utils.memoized
     def get_datasource(self):
-        return (
-            db.session.query(self.cls_model)
-            .filter_by(id=self.datasource_id)
-            .first()
-        )
+        if self.datasource_id is None:
+            return None
+        # get() is served from the identity map when already loaded
+        return db.session.query(self.cls_model).get(self.datasource_id)
 
     @renders('datasource_name')
     def datasource_link(self):
@@ -216,12 +245,7 @@ class Slice(Model, AuditMixinNullable, ImportMixin):
         return form_data
 
     def get_explore_url(self, base_url='/superset/explore', overrides=None):
-        overrides = overrides or {}
-        form_data = {'slice_id': self.id}
-        form_data.update(overrides)
-        params = parse.quote(json.dumps(form_data))
-        return (
-            '{base_url}/?form_data={params}'.format(**locals()))
+        return get_explore_url(self.id, base_url, overrides)
 
     @property
     def slice_url(self):
@@ -362,7 +386,13 @@ class Dashboard(Model, AuditMixinNullable, ImportMixin):
 
     @property
     def datasources(self):
-        return {slc.datasource for slc in self.slices}
+        # One query per datasource type rather than one per slice. Once
+        # loaded, slc.datasource finds them in the session's identity map.
+        # Columns and metrics come along since ds.data walks both
+        keys = [(slc.datasource_type, slc.datasource_id) for slc in self.slices]
+        datasources = ConnectorRegistry.get_datasources_by_key(
+            db.session, keys, eager=True)
+        return {datasources.get(key) for key in keys}
 
     @property
     def sqla_metadata(self):
@@ -659,8 +689,7 @@ class Database(Model, AuditMixinNullable, ImportMixin):
 
     @property
     def backend(self):
-        url = make_url(self.sqlalchemy_uri_decrypted)
-        return url.get_backend_name()
+        return get_backend_name(self.sqlalchemy_uri)
 
     @classmethod
     def get_password_masked_url_from_uri(cls, uri):
@@ -733,7 +762,6 @@ class Database(Model, AuditMixinNullable, ImportMixin):
         if configuration:
             params['connect_args'] = {'configuration': configuration}
 
-        DB_CONNECTION_MUTATOR = config.get('DB_CONNECTION_MUTATOR')
         if DB_CONNECTION_MUTATOR:
             url, params = DB_CONNECTION_MUTATOR(
                 url, params, effective_username, security_manager)
@@ -745,19 +773,25 @@ class Database(Model, AuditMixinNullable, ImportMixin):
     def get_quoter(self):
         return self.get_dialect().identifier_preparer.quote
 
-    def get_df(self, sql, schema):
+    def _execute_leading_statements(self, sql, schema):
+        """Runs all but the last statement of ``sql``
+
+        Returns the engine and the last statement, left for the caller to
+        fetch the results of.
+        """
         sqls = [str(s).strip().strip(';') for s in sqlparse.parse(sql)]
         eng = self.get_sqla_engine(schema=schema)
 
         for i in range(len(sqls) - 1):
             eng.execute(sqls[i])
+        return eng, sqls[-1]
 
-        df = pd.read_sql_query(sqls[-1], eng)
-
+    @staticmethod
+    def _convert_nested_values(df):
         def needs_conversion(df_series):
             if df_series.empty:
                 return False
-            if isinstance(df_series[0], (list, dict)):
+            if isinstance(df_series.iloc[0], (list, dict)):
                 return True
             return False
 
@@ -766,6 +800,34 @@ class Database(Model, AuditMixinNullable, ImportMixin):
                 df[k] = df[k].apply(utils.json_dumps_w_dates)
         return df
 
+    def get_df(self, sql, schema):
+        eng, sql = self._execute_leading_statements(sql, schema)
+        return self._convert_nested_values(pd.read_sql_query(sql, eng))
+
+    def iter_df(self, sql, schema, chunksize=10000):
+        """Yields the results of ``sql`` as DataFrames of ``chunksize`` rows
+
+        Rows are fetched from the cursor as the frames are consumed, so the
+        whole result set never has to be held at once. A result without
+        rows still yields one empty frame carrying the column names.
+        """
+        eng, sql = self._execute_leading_statements(sql, schema)
+        result = eng.execute(sql)
+        try:
+            columns = result.keys()
+            first = True
+            while True:
+                rows = result.fetchmany(chunksize)
+                if not rows and not first:
+                    break
+                first = False
+                yield self._convert_nested_values(pd.DataFrame.from_records(
+                    rows, columns=columns, coerce_float=True))
+                if len(rows) < chunksize:
+                    break
+        finally:
+            result.close()
+
     def compile_sqla_query(self, qry, schema=None):
         eng = self.get_sqla_engine(schema=schema)
         compiled = qry.compile(eng, compile_kwargs={'literal_binds': True})
@@ -792,6 +854,10 @@ class Database(Model, AuditMixinNullable, ImportMixin):
         engine = self.get_sqla_engine()
         return sqla.inspect(engine)
 
+    @cache_util.memoized_func(
+        timeout=TABLE_NAMES_CACHE_TIMEOUT,
+        key=table_names_cache_key,
+        attribute_in_key='id')
     def all_table_names(self, schema=None, force=False):
         if not schema:
             if not self.allow_multi_schema_metadata_fetch:
@@ -802,6 +868,10 @@ class Database(Model, AuditMixinNullable, ImportMixin):
         return sorted(
             self.db_engine_spec.get_table_names(schema, self.inspector))
 
+    @cache_util.memoized_func(
+        timeout=TABLE_NAMES_CACHE_TIMEOUT,
+        key=view_names_cache_key,
+        attribute_in_key='id')
     def all_view_names(self, schema=None, force=False):
         if not schema:
             if not self.allow_multi_schema_metadata_fetch:
@@ -816,9 +886,27 @@ class Database(Model, AuditMixinNullable, ImportMixin):
             pass
         return views
 
-    def all_schema_names(self):
+    @cache_util.memoized_func(
+        timeout=TABLE_NAMES_CACHE_TIMEOUT,
+        key=lambda db_id, *args, **kwargs: 'db:{}:schema_list'.format(db_id),
+        attribute_in_key='id')
+    def all_schema_names(self, force=False):
         return sorted(self.db_engine_spec.get_schema_names(self.inspector))
 
+    def clear_table_names_cache(self, schemas=None):
+        """Drops the cached table and view names of the given schemas, or
+        of all the database's schemas. The names listed across schemas
+        (schema None) are always dropped"""
+        if not tables_cache or self.id is None:
+            return
+        if schemas is None:
+            schemas = self.all_schema_names()
+        keys = []
+        for schema in set(schemas) | {None}:
+            keys.append(table_names_cache_key(self.id, schema))
+            keys.append(view_names_cache_key(self.id, schema))
+        tables_cache.delete_many(*keys)
+
     @property
     def db_engine_spec(self):
         return db_engine_specs.engines.get(
@@ -865,6 +953,26 @@ class Database(Model, AuditMixinNullable, ImportMixin):
             autoload=True,
             autoload_with=self.get_sqla_engine())
 
+    def get_tables(self, table_names, schema=None):
+        """Reflects several tables of a schema with a single engine
+
+        Returns a dict of the reflected tables by name, empty if any of them
+        couldn't be reflected"""
+        extra = self.get_extra()
+        meta = MetaData(**extra.get('metadata_params', {}))
+        try:
+            meta.reflect(
+                bind=self.get_sqla_engine(),
+                schema=schema or None,
+                views=True,
+                only=table_names)
+        except Exception as e:
+            logging.exception(e)
+            return {}
+        return {
+            t.name: t for t in meta.tables.values()
+            if t.schema == (schema or None)}
+
     def get_columns(self, table_name, schema=None):
         return self.inspector.get_columns(table_name, schema)
 
@@ -8,7 +8,7 @@ from __future__ import unicode_literals
 
 import logging
 
-from flask import g
+from flask import g, has_request_context
 from flask_appbuilder.security.sqla import models as ab_models
 from flask_appbuilder.security.sqla.manager import SecurityManager
 from sqlalchemy import or_
@@ -86,10 +86,63 @@ class SupersetSecurityManager(SecurityManager):
             return '[{}].[{}]'.format(database, schema)
 
     def can_access(self, permission_name, view_name, user=None):
-        """Protecting from has_access failing from missing perms/view"""
+        """Protecting from has_access failing from missing perms/view
+
+        Answers are memoized for the duration of the request since views
+        tend to check the same (user, permission, view) triplets repeatedly.
+        """
         if not user:
             user = g.user
-        if user.is_anonymous():
+        is_anonymous = user.is_anonymous()
+        if not has_request_context():
+            return self._can_access(user, is_anonymous, permission_name, view_name)
+
+        access_cache = getattr(g, '_access_cache', None)
+        if access_cache is None:
+            access_cache = g._access_cache = {}
+        key = (
+            None if is_anonymous else user.get_id(),
+            permission_name,
+            view_name,
+        )
+        if key not in access_cache:
+            if is_anonymous:
+                access_cache[key] = self.is_item_public(
+                    permission_name, view_name)
+            else:
+                access_cache[key] = (
+                    (permission_name, view_name) in self._view_access(user))
+        return access_cache[key]
+
+    def _view_access(self, user):
+        """Returns the (permission, view_menu) names granted to the user
+
+        Fetched with a single query once per request, rather than walking
+        each role's permissions and lazy loading their names one by one.
+        """
+        view_access_cache = getattr(g, '_view_access_cache', None)
+        if view_access_cache is None:
+            view_access_cache = g._view_access_cache = {}
+        user_id = user.get_id()
+        if user_id not in view_access_cache:
+            role_ids = [role.id for role in user.roles]
+            view_access = set()
+            if role_ids:
+                qry = (
+                    self.get_session
+                    .query(ab_models.Permission.name, ab_models.ViewMenu.name)
+                    .select_from(ab_models.PermissionView)
+                    .join(ab_models.PermissionView.permission)
+                    .join(ab_models.PermissionView.view_menu)
+                    .join(ab_models.PermissionView.role)
+                    .filter(ab_models.Role.id.in_(role_ids))
+                )
+                view_access = set(qry.all())
+            view_access_cache[user_id] = view_access
+        return view_access_cache[user_id]
+
+    def _can_access(self, user, is_anonymous, permission_name, view_name):
+        if is_anonymous:
             return self.is_item_public(permission_name, view_name)
         return self._has_view_access(user, permission_name, view_name)
 
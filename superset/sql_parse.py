@@ -18,22 +18,29 @@ PRECEDES_TABLE_NAME = {'FROM', 'JOIN', 'DESC', 'DESCRIBE', 'WITH'}
 class SupersetQuery(object):
     def __init__(self, sql_statement):
         self.sql = sql_statement
+        self._parsed = None
         self._table_names = set()
         self._alias_names = set()
         # TODO: multistatement support
 
-        logging.info('Parsing with sqlparse statement {}'.format(self.sql))
-        self._parsed = sqlparse.parse(self.sql)
-        for statement in self._parsed:
-            self.__extract_from_token(statement)
-        self._table_names = self._table_names - self._alias_names
+    def _parse(self):
+        """Runs sqlparse on first use only, callers that just want the
+        stripped statement don't pay for it"""
+        if self._parsed is None:
+            logging.info('Parsing with sqlparse statement {}'.format(self.sql))
+            self._parsed = sqlparse.parse(self.sql)
+            for statement in self._parsed:
+                self.__extract_from_token(statement)
+            self._table_names = self._table_names - self._alias_names
+        return self._parsed
 
     @property
     def tables(self):
+        self._parse()
         return self._table_names
 
     def is_select(self):
-        return self._parsed[0].get_type() == 'SELECT'
+        return self._parse()[0].get_type() == 'SELECT'
 
     def stripped(self):
         return self.sql.strip(' \t\n;')
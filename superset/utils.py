@@ -37,17 +37,24 @@ import parsedatetime
 from past.builtins import basestring
 from pydruid.utils.having import Having
 import pytz
+import simplejson
 import sqlalchemy as sa
 from sqlalchemy import event, exc, select
 from sqlalchemy.types import TEXT, TypeDecorator
 
 from superset.exceptions import SupersetException, SupersetTimeoutException
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 logging.getLogger('MARKDOWN').setLevel(logging.INFO)
 
 PY3K = sys.version_info >= (3, 0)
 EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = pytz.utc.localize(EPOCH)
 DTTM_ALIAS = '__timestamp'
 ADHOC_METRIC_EXPRESSION_TYPES = {
     'SIMPLE': 'SIMPLE',
@@ -56,6 +63,16 @@ ADHOC_METRIC_EXPRESSION_TYPES = {
 
 JS_MAX_INTEGER = 9007199254740991   # Largest int Java Script can handle 2^53-1
 
+# Maps the special time related `extra_filters` columns to form_data keys
+EXTRA_FILTER_DATE_OPTIONS = {
+    '__from': 'since',
+    '__to': 'until',
+    '__time_col': 'granularity_sqla',
+    '__time_grain': 'time_grain_sqla',
+    '__time_origin': 'druid_time_origin',
+    '__granularity': 'granularity',
+}
+
 
 def flasher(msg, severity=None):
     """Flask's flash if available, logging call if not"""
@@ -360,8 +377,7 @@ def pessimistic_json_iso_dttm_ser(obj):
 
 def datetime_to_epoch(dttm):
     if dttm.tzinfo:
-        epoch_with_tz = pytz.utc.localize(EPOCH)
-        return (dttm - epoch_with_tz).total_seconds() * 1000
+        return (dttm - EPOCH_UTC).total_seconds() * 1000
     return (dttm - EPOCH).total_seconds() * 1000
 
 
@@ -371,23 +387,103 @@ def now_as_float():
 
 def json_int_dttm_ser(obj):
     """json serializer that deals with dates"""
-    val = base_json_conv(obj)
-    if val is not None:
-        return val
+    # Dates are by far the most common case, check for them first
     if isinstance(obj, (datetime, pd.Timestamp)):
-        obj = datetime_to_epoch(obj)
+        return datetime_to_epoch(obj)
     elif isinstance(obj, date):
-        obj = (obj - EPOCH.date()).total_seconds() * 1000
-    else:
+        return (obj - EPOCH.date()).total_seconds() * 1000
+    val = base_json_conv(obj)
+    if val is None:
         raise TypeError(
             'Unserializable object {} of type {}'.format(obj, type(obj)))
-    return obj
+    return val
 
 
 def json_dumps_w_dates(payload):
     return json.dumps(payload, default=json_int_dttm_ser)
 
 
+def _decode_bytes_first(default, encoding):
+    def wrapped(obj):
+        if isinstance(obj, bytes):
+            return obj.decode(encoding)
+        return default(obj)
+    return wrapped
+
+
+def json_dumps_fast(
+        obj, default=json_int_dttm_ser, sort_keys=False, encoding='utf-8',
+        raw=False):
+    """Serializes API payloads, using orjson when it is installed
+
+    The output matches ``simplejson.dumps(obj, default=default,
+    ignore_nan=True)`` minus the whitespace: dates and datetimes still get
+    formatted as ``default`` would and NaNs become ``null``. Anything orjson refuses
+    (namedtuples, ints over 64 bits, ...) falls back to simplejson.
+    orjson always hands bytes to ``default``, so unless ``encoding`` is
+    None they are decoded first, as simplejson does. With ``raw`` orjson's
+    utf-8 bytes are returned as is, for response bodies that would only be
+    encoded back.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if default not in (json_iso_dttm_ser, pessimistic_json_iso_dttm_ser):
+            # orjson writes dates the way isoformat() does, only other
+            # formats (epoch ms, ...) need ``default`` to see them
+            option |= orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        orjson_default = default
+        if encoding is not None:
+            orjson_default = _decode_bytes_first(default, encoding)
+        try:
+            payload = orjson.dumps(obj, default=orjson_default, option=option)
+            return payload if raw else payload.decode('utf-8')
+        except TypeError:
+            pass
+    return simplejson.dumps(
+        obj, default=default, ignore_nan=True, sort_keys=sort_keys,
+        encoding=encoding)
+
+
+def json_loads_fast(s):
+    """Parses JSON, using orjson when it is installed
+
+    Documents orjson rejects (NaN literals, ints over 64 bits, ...) are
+    parsed by simplejson instead.
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(s)
+        except ValueError:
+            pass
+    return simplejson.loads(s)
+
+
+def iter_df_to_csv(df, chunksize=10000, **kwargs):
+    """Yields ``df.to_csv(**kwargs)`` in chunks of ``chunksize`` rows
+
+    Lets large CSV exports be streamed to the client rather than rendered
+    into one big string first.
+    """
+    return iter_dfs_to_csv(
+        (
+            df.iloc[start:start + chunksize]
+            for start in range(0, max(len(df.index), 1), chunksize)
+        ),
+        **kwargs)
+
+
+def iter_dfs_to_csv(dfs, **kwargs):
+    """Yields ``to_csv(**kwargs)`` for each DataFrame of ``dfs`` in turn
+
+    The header, if any, is only written for the first one.
+    """
+    header = kwargs.pop('header', True)
+    for i, df in enumerate(dfs):
+        yield df.to_csv(header=header if i == 0 else False, **kwargs)
+
+
 def error_msg_from_exception(e):
     """Translate exception into error message
 
@@ -723,14 +819,6 @@ def merge_extra_filters(form_data):
         # potential conflicts with column that would be named `from` or `to`
         if 'filters' not in form_data:
             form_data['filters'] = []
-        date_options = {
-            '__from': 'since',
-            '__to': 'until',
-            '__time_col': 'granularity_sqla',
-            '__time_grain': 'time_grain_sqla',
-            '__time_origin': 'druid_time_origin',
-            '__granularity': 'granularity',
-        }
         # Grab list of existing filters 'keyed' on the column and operator
 
         def get_filter_key(f):
@@ -741,9 +829,9 @@ def merge_extra_filters(form_data):
                 existing_filters[get_filter_key(existing)] = existing['val']
         for filtr in form_data['extra_filters']:
             # Pull out time filters/options and merge into form data
-            if date_options.get(filtr['col']):
+            if EXTRA_FILTER_DATE_OPTIONS.get(filtr['col']):
                 if filtr.get('val'):
-                    form_data[date_options[filtr['col']]] = filtr['val']
+                    form_data[EXTRA_FILTER_DATE_OPTIONS[filtr['col']]] = filtr['val']
             elif filtr['val'] and len(filtr['val']):
                 # Merge column filters
                 filter_key = get_filter_key(filtr)
@@ -15,10 +15,12 @@ from flask import abort, flash, g, get_flashed_messages, redirect, Response
 from flask_appbuilder import BaseView, ModelView
 from flask_appbuilder.actions import action
 from flask_appbuilder.models.sqla.filters import BaseFilter
+from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_appbuilder.widgets import ListWidget
 from flask_babel import get_locale
 from flask_babel import gettext as __
 from flask_babel import lazy_gettext as _
+from sqlalchemy.exc import IntegrityError
 import yaml
 
 from superset import conf, security_manager, utils
@@ -49,7 +51,8 @@ def json_error_response(msg=None, status=500, stacktrace=None, payload=None, lin
         if link:
             payload['link'] = link
     return Response(
-        json.dumps(payload, default=utils.json_iso_dttm_ser),
+        utils.json_dumps_fast(
+            payload, default=utils.json_iso_dttm_ser, raw=True),
         status=status, mimetype='application/json')
 
 
@@ -101,6 +104,29 @@ class BaseSupersetView(BaseView):
         }
 
 
+class SupersetSQLAInterface(SQLAInterface):
+    """A SQLAInterface that applies loader options to its list queries
+
+    List views render related objects (databases, users, ...) for every
+    row, pass ``list_load_options`` to load them along with the page
+    instead of lazily, one row at a time."""
+    def __init__(self, obj, session=None, list_load_options=()):
+        super(SupersetSQLAInterface, self).__init__(obj, session=session)
+        self.list_load_options = list_load_options
+
+    def _get_base_query(
+            self, query=None, filters=None, order_column='', order_direction=''):
+        query = super(SupersetSQLAInterface, self)._get_base_query(
+            query=query, filters=filters, order_column=order_column,
+            order_direction=order_direction)
+        # FAB builds its count(*) query through here as well, only the
+        # queries selecting the model itself can take the options
+        if (self.list_load_options
+                and query.column_descriptions[0]['type'] is self.obj):
+            query = query.options(*self.list_load_options)
+        return query
+
+
 class SupersetListWidget(ListWidget):
     template = 'superset/fab_overrides/list.html'
 
@@ -195,16 +221,79 @@ class DeleteMixin(object):
     def muldelete(self, items):
         if not items:
             abort(404)
+        to_delete = []
         for item in items:
             try:
                 self.pre_delete(item)
             except Exception as e:
                 flash(str(e), 'danger')
             else:
-                self._delete(item.id)
+                to_delete.append(item)
+        if to_delete:
+            self._delete_many(to_delete)
         self.update_redirect()
         return redirect(self.get_redirect())
 
+    def _delete_many(self, items):
+        """
+            Deletes all the items and their related permissions in a single
+            transaction, fetching the permissions with one query per model
+            instead of one per item
+
+            :param items:
+                list of already loaded (and pre_delete checked) items
+        """
+        sesh = security_manager.get_session
+        perm_names = set()
+        for item in items:
+            if hasattr(item, 'get_perm'):
+                perm_names.add(item.get_perm())
+            if hasattr(item, 'schema_perm'):
+                perm_names.add(item.schema_perm)
+        perm_names.discard(None)
+
+        view_menus = []
+        pvs = []
+        if perm_names:
+            view_menu_model = security_manager.viewmenu_model
+            pv_model = security_manager.permissionview_model
+            view_menus = (
+                sesh.query(view_menu_model)
+                .filter(view_menu_model.name.in_(perm_names))
+                .all()
+            )
+            if view_menus:
+                pvs = (
+                    sesh.query(pv_model)
+                    .filter(pv_model.view_menu_id.in_(
+                        [vm.id for vm in view_menus]))
+                    .all()
+                )
+
+        try:
+            for item in items:
+                sesh.delete(item)
+            for pv in pvs:
+                sesh.delete(pv)
+            for view_menu in view_menus:
+                sesh.delete(view_menu)
+            sesh.commit()
+        except IntegrityError as e:
+            sesh.rollback()
+            logging.warning(e)
+            flash(
+                str(self.datamodel.delete_integrity_error_message), 'warning')
+            return
+        except Exception as e:
+            sesh.rollback()
+            logging.exception(e)
+            flash(str(self.datamodel.general_error_message), 'danger')
+            return
+
+        for item in items:
+            self.post_delete(item)
+        flash(str(self.datamodel.delete_row_message), 'success')
+
 
 class SupersetFilter(BaseFilter):
 
@@ -248,8 +337,8 @@ class SupersetFilter(BaseFilter):
 
     def has_all_datasource_access(self):
         return (
-            self.has_role(['Admin', 'Alpha']) or
-            self.has_perm('all_datasource_access', 'all_datasource_access'))
+            self.has_role(['Admin', 'Alpha'])
+            or self.has_perm('all_datasource_access', 'all_datasource_access'))
 
 
 class DatasourceFilter(SupersetFilter):
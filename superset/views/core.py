@@ -5,16 +5,22 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import defaultdict
+from contextlib import closing
 from datetime import datetime, timedelta
 import logging
+from multiprocessing.pool import ThreadPool
 import os
 import re
+import shutil
+import tempfile
 import time
 import traceback
 from urllib import parse
 
 from flask import (
-    flash, g, Markup, redirect, render_template, request, Response, url_for,
+    copy_current_request_context, flash, g, make_response, Markup, redirect,
+    render_template, request, Response, stream_with_context, url_for,
 )
 from flask_appbuilder import expose, SimpleFormView
 from flask_appbuilder.actions import action
@@ -26,9 +32,12 @@ import pandas as pd
 import simplejson as json
 from six import text_type
 import sqlalchemy as sqla
-from sqlalchemy import and_, create_engine, or_, update
+from sqlalchemy import create_engine
 from sqlalchemy.engine.url import make_url
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext import baked
+from sqlalchemy.orm import defer, joinedload
+from sqlalchemy.pool import NullPool
 from unidecode import unidecode
 from werkzeug.routing import BaseConverter
 from werkzeug.utils import secure_filename
@@ -52,9 +61,13 @@ from superset.utils import (
 from .base import (
     api, BaseSupersetView, CsvResponse, DeleteMixin,
     generate_download_headers, get_error_msg, get_user_roles,
-    json_error_response, SupersetFilter, SupersetModelView, YamlExportMixin,
+    json_error_response, SupersetFilter, SupersetModelView,
+    SupersetSQLAInterface, YamlExportMixin,
+)
+from .utils import (
+    bootstrap_user_data, select_star_cache_key, SELECT_STAR_CACHE_TIMEOUT,
+    select_star_is_cacheable,
 )
-from .utils import bootstrap_user_data
 
 config = app.config
 stats_logger = config.get('STATS_LOGGER')
@@ -69,14 +82,57 @@ ACCESS_REQUEST_MISSING_ERR = __(
     'The access requests seem to have been deleted')
 USER_MISSING_ERR = __('The user seems to have been deleted')
 DATASOURCE_ACCESS_ERR = __("You don't have access to this datasource")
+# Lazy, so they're translated in the locale of the request that fails.
+# json_error_response turns them into text
+CHART_ALTER_ERR = _("You don't have the rights to alter this chart")
+CHART_CREATE_ERR = _("You don't have the rights to create a chart")
+DASHBOARD_ALTER_ERR = _("You don't have the rights to alter this dashboard")
+DASHBOARD_CREATE_ERR = _("You don't have the rights to create a dashboard")
+
+# Column models the checkbox endpoint can toggle, by their inline view name.
+# The registry is filled in before the views are imported
+MODELVIEW_TO_MODEL = {
+    'TableColumnInlineView': ConnectorRegistry.sources['table'].column_class,
+    'DruidColumnInlineView': ConnectorRegistry.sources['druid'].column_class,
+}
+
+# Query.to_dict() reads the query's database and user, load them along
+# with the queries rather than lazily for each one
+QUERY_TO_DICT_OPTIONS = (
+    joinedload(Query.database),
+    joinedload(Query.user),
+)
 
-FORM_DATA_KEY_BLACKLIST = []
+# Seconds browsers may reuse table metadata and the static theme page
+TABLE_METADATA_MAX_AGE = 60
+THEME_MAX_AGE = 60 * 60
+
+FORM_DATA_KEY_BLACKLIST = frozenset()
 if not config.get('ENABLE_JAVASCRIPT_CONTROLS'):
-    FORM_DATA_KEY_BLACKLIST = [
+    FORM_DATA_KEY_BLACKLIST = frozenset([
         'js_tooltip',
         'js_onclick_href',
         'js_data_mutator',
-    ]
+    ])
+
+# Settings read on every request, config doesn't change once the app is up
+SQLLAB_TIMEOUT = config.get('SQLLAB_TIMEOUT')
+SQLLAB_ASYNC_TIME_LIMIT_MS = config.get('SQLLAB_ASYNC_TIME_LIMIT_SEC') * 1000
+DISPLAY_SQL_MAX_ROW = config.get('DISPLAY_SQL_MAX_ROW')
+HTTP_HEADERS = tuple(config.get('HTTP_HEADERS').items())
+
+# Chunk size used when spooling uploaded files to disk, werkzeug's default
+# of 16KB makes large CSV uploads syscall bound
+UPLOAD_BUFFER_SIZE = 1 << 20
+
+# The datasource picker list is the same for every user, it is cached until
+# a datasource changes, or for a minute to pick up renamed databases / users
+DATASOURCES_CACHE_KEY = 'superset/datasources'
+DATASOURCES_CACHE_TIMEOUT = 60
+
+# SQL Lab looks its queries up by client_id / results_key on every poll,
+# baking those lookups compiles their SELECT once instead of per request
+query_bakery = baked.bakery()
 
 
 def get_database_access_error_msg(database_name):
@@ -89,10 +145,59 @@ def get_datasource_access_error_msg(datasource_name):
               '`all_datasource_access` permission', name=datasource_name)
 
 
+def get_query_by(column, value):
+    """Returns the one Query whose ``column`` equals ``value``"""
+    baked_query = query_bakery(lambda session: session.query(Query))
+    # the column is part of the cache key, the lambda alone doesn't tell
+    # the client_id and results_key lookups apart
+    baked_query.add_criteria(
+        lambda q: q.filter(column == sqla.bindparam('value')), column.key)
+    return baked_query(db.session).params(value=value).one()
+
+
 def json_success(json_msg, status=200):
     return Response(json_msg, status=status, mimetype='application/json')
 
 
+def json_success_fast(obj, status=200, default=utils.json_int_dttm_ser):
+    """Serializes ``obj`` with json_dumps_fast into a json_success"""
+    return json_success(
+        utils.json_dumps_fast(obj, default=default, raw=True), status=status)
+
+
+def json_conditional_success(json_msg, max_age=None):
+    """A json_success that answers 304 when the client has it already
+
+    When ``max_age`` is given the browser may also reuse its private copy
+    for that many seconds without asking again."""
+    resp = json_success(json_msg)
+    if max_age is not None:
+        resp.cache_control.private = True
+        resp.cache_control.max_age = max_age
+    resp.add_etag()
+    return resp.make_conditional(request)
+
+
+def delete_access_requests(session, ids):
+    """Deletes the given access requests with a single statement"""
+    if ids:
+        (
+            session.query(DAR)
+            .filter(DAR.id.in_(ids))
+            .delete(synchronize_session=False)
+        )
+
+
+def clear_datasources_cache(mapper, connection, target):
+    if cache:
+        cache.delete(DATASOURCES_CACHE_KEY)
+
+
+for source_class in ConnectorRegistry.sources.values():
+    for event_name in ('after_insert', 'after_update', 'after_delete'):
+        sqla.event.listen(source_class, event_name, clear_datasources_cache)
+
+
 def is_owner(obj, user):
     """ Check if user is owner of the slice """
     return obj and user in obj.owners
@@ -120,19 +225,20 @@ def check_ownership(obj, raise_if_false=True):
     roles = (r.name for r in get_user_roles())
     if 'Admin' in roles:
         return True
-    session = db.create_scoped_session()
-    orig_obj = session.query(obj.__class__).filter_by(id=obj.id).first()
-    owner_names = (user.username for user in orig_obj.owners)
-    if (
-            hasattr(orig_obj, 'created_by') and
-            orig_obj.created_by and
-            orig_obj.created_by.username == g.user.username):
-        return True
-    if (
-            hasattr(orig_obj, 'owners') and
-            g.user and
-            hasattr(g.user, 'username') and
-            g.user.username in owner_names):
+    # Ownership is checked against what is stored. An object that is
+    # unchanged in the current session already reflects that, so only
+    # objects with pending changes (as in pre_update) need to be re-read
+    state = sqla.inspect(obj)
+    if state.persistent and not state.modified:
+        owned = _owned_by_current_user(obj)
+    else:
+        session = db.create_scoped_session()
+        try:
+            orig_obj = session.query(obj.__class__).filter_by(id=obj.id).first()
+            owned = _owned_by_current_user(orig_obj)
+        finally:
+            session.remove()
+    if owned:
         return True
     if raise_if_false:
         raise security_exception
@@ -140,6 +246,19 @@ def check_ownership(obj, raise_if_false=True):
         return False
 
 
+def _owned_by_current_user(obj):
+    if (
+            hasattr(obj, 'created_by') and
+            obj.created_by and
+            obj.created_by.username == g.user.username):
+        return True
+    return (
+        hasattr(obj, 'owners') and
+        g.user and
+        hasattr(g.user, 'username') and
+        g.user.username in (user.username for user in obj.owners))
+
+
 class SliceFilter(SupersetFilter):
     def apply(self, query, func):  # noqa
         if self.has_all_datasource_access():
@@ -161,26 +280,22 @@ class DashboardFilter(SupersetFilter):
         User = security_manager.user_model
         # TODO(bogdan): add `schema_access` support here
         datasource_perms = self.get_view_menus('datasource_access')
-        slice_ids_qry = (
-            db.session
-            .query(Slice.id)
-            .filter(Slice.perm.in_(datasource_perms))
-        )
+        # A UNION of the two id queries rather than OR-ing two IN subqueries,
+        # so that each branch can be resolved through its own index
         owner_ids_qry = (
             db.session
             .query(Dash.id)
             .join(Dash.owners)
             .filter(User.id == User.get_user_id())
         )
-        query = query.filter(
-            or_(Dash.id.in_(
-                db.session.query(Dash.id)
-                .distinct()
-                .join(Dash.slices)
-                .filter(Slice.id.in_(slice_ids_qry)),
-            ), Dash.id.in_(owner_ids_qry)),
+        dash_ids_qry = (
+            db.session
+            .query(Dash.id)
+            .join(Dash.slices)
+            .filter(Slice.perm.in_(datasource_perms))
+            .union(owner_ids_qry)
         )
-        return query
+        return query.filter(Dash.id.in_(dash_ids_qry))
 
 
 class DatabaseView(SupersetModelView, DeleteMixin, YamlExportMixin):  # noqa
@@ -289,13 +404,17 @@ class DatabaseView(SupersetModelView, DeleteMixin, YamlExportMixin):  # noqa
     def pre_add(self, db):
         db.set_sqlalchemy_uri(db.sqlalchemy_uri)
         security_manager.merge_perm('database_access', db.perm)
-        for schema in db.all_schema_names():
+        for schema in db.all_schema_names(force=True):
             security_manager.merge_perm(
                 'schema_access', security_manager.get_schema_perm(db, schema))
 
     def pre_update(self, db):
         self.pre_add(db)
 
+    def post_update(self, db):
+        # The connection or its schemas may have changed
+        db.clear_table_names_cache()
+
     def _delete(self, pk):
         DeleteMixin._delete(self, pk)
 
@@ -321,12 +440,12 @@ appbuilder.add_view(
 
 
 class DatabaseAsync(DatabaseView):
-    list_columns = [
+    list_columns = (
         'id', 'database_name',
         'expose_in_sqllab', 'allow_ctas', 'force_ctas_schema',
         'allow_run_async', 'allow_run_sync', 'allow_dml',
         'allow_multi_schema_metadata_fetch',
-    ]
+    )
 
 
 appbuilder.add_view_no_menu(DatabaseAsync)
@@ -351,27 +470,31 @@ class CsvToDatabaseView(SimpleFormView):
         csv_file = form.csv_file.data
         form.csv_file.data.filename = secure_filename(form.csv_file.data.filename)
         csv_filename = form.csv_file.data.filename
-        path = os.path.join(config['UPLOAD_FOLDER'], csv_filename)
+        # Each upload gets its own directory so that concurrent uploads of
+        # files with the same name don't overwrite one another
+        upload_dir = None
         try:
             utils.ensure_path_exists(config['UPLOAD_FOLDER'])
-            csv_file.save(path)
+            upload_dir = tempfile.mkdtemp(dir=config['UPLOAD_FOLDER'])
+            path = os.path.join(upload_dir, csv_filename)
+            csv_file.save(path, buffer_size=UPLOAD_BUFFER_SIZE)
             table = SqlaTable(table_name=form.name.data)
             table.database = form.data.get('con')
             table.database_id = table.database.id
-            table.database.db_engine_spec.create_table_from_csv(form, table)
-        except Exception as e:
-            try:
-                os.remove(path)
-            except OSError:
-                pass
-            message = 'Table name {} already exists. Please pick another'.format(
-                form.name.data) if isinstance(e, IntegrityError) else text_type(e)
+            table.database.db_engine_spec.create_table_from_csv(form, table, path)
+        except IntegrityError:
             flash(
-                message,
+                'Table name {} already exists. Please pick another'.format(
+                    form.name.data),
                 'danger')
             return redirect('/csvtodatabaseview/form')
+        except Exception as e:
+            flash(text_type(e), 'danger')
+            return redirect('/csvtodatabaseview/form')
+        finally:
+            if upload_dir:
+                shutil.rmtree(upload_dir, ignore_errors=True)
 
-        os.remove(path)
         # Go back to welcome page / splash screen
         db_name = table.database.database_name
         message = _('CSV file "{0}" uploaded to table "{1}" in '
@@ -386,7 +509,7 @@ appbuilder.add_view_no_menu(CsvToDatabaseView)
 
 
 class DatabaseTablesAsync(DatabaseView):
-    list_columns = ['id', 'all_table_names', 'all_schema_names']
+    list_columns = ('id', 'all_table_names', 'all_schema_names')
 
 
 appbuilder.add_view_no_menu(DatabaseTablesAsync)
@@ -532,7 +655,16 @@ appbuilder.add_view_no_menu(SliceAddView)
 
 
 class DashboardModelView(SupersetModelView, DeleteMixin):  # noqa
-    datamodel = SQLAInterface(models.Dashboard)
+    # The list only links to each dashboard, its layout and css can be
+    # large and are left for the pages that show them
+    datamodel = SupersetSQLAInterface(
+        models.Dashboard,
+        list_load_options=(
+            defer(models.Dashboard.position_json),
+            defer(models.Dashboard.css),
+            joinedload(models.Dashboard.created_by),
+        ),
+    )
 
     list_title = _('List Dashboards')
     show_title = _('Show Dashboard')
@@ -590,9 +722,9 @@ class DashboardModelView(SupersetModelView, DeleteMixin):  # noqa
             obj.owners.append(g.user)
         utils.validate_json(obj.json_metadata)
         utils.validate_json(obj.position_json)
-        owners = [o for o in obj.owners]
+        owners = set(obj.owners)
         for slc in obj.slices:
-            slc.owners = list(set(owners) | set(slc.owners))
+            slc.owners = list(owners | set(slc.owners))
 
     def pre_update(self, obj):
         check_ownership(obj)
@@ -735,7 +867,7 @@ class R(BaseSupersetView):
     @log_this
     @expose('/<url_id>')
     def index(self, url_id):
-        url = db.session.query(models.Url).filter_by(id=url_id).first()
+        url = db.session.query(models.Url).get(url_id)
         if url:
             return redirect('/' + url.url)
         else:
@@ -750,8 +882,7 @@ class R(BaseSupersetView):
         db.session.add(obj)
         db.session.commit()
         return Response(
-            '{scheme}://{request.headers[Host]}/r/{obj.id}'.format(
-                scheme=request.scheme, request=request, obj=obj),
+            '{}://{}/r/{}'.format(request.scheme, request.headers['Host'], obj.id),
             mimetype='text/plain')
 
     @expose('/msg/')
@@ -768,17 +899,24 @@ class Superset(BaseSupersetView):
     """The base views for Superset!"""
     def json_response(self, obj, status=200):
         return Response(
-            json.dumps(obj, default=utils.json_int_dttm_ser),
+            utils.json_dumps_fast(obj, raw=True),
             status=status,
             mimetype='application/json')
 
     @has_access_api
     @expose('/datasources/')
     def datasources(self):
-        datasources = ConnectorRegistry.get_all_datasources(db.session)
-        datasources = [o.short_data for o in datasources]
-        datasources = sorted(datasources, key=lambda o: o['name'])
-        return self.json_response(datasources)
+        payload = cache.get(DATASOURCES_CACHE_KEY) if cache else None
+        if payload is None:
+            datasources = ConnectorRegistry.get_all_datasources(db.session)
+            datasources = [o.short_data for o in datasources]
+            datasources = sorted(datasources, key=lambda o: o['name'])
+            payload = utils.json_dumps_fast(datasources)
+            if cache:
+                cache.set(
+                    DATASOURCES_CACHE_KEY, payload,
+                    timeout=DATASOURCES_CACHE_TIMEOUT)
+        return json_conditional_success(payload)
 
     @has_access_api
     @expose('/override_role_permissions/', methods=['POST'])
@@ -803,26 +941,40 @@ class Superset(BaseSupersetView):
         role_name = data['role_name']
         databases = data['database']
 
-        db_ds_names = set()
-        for dbs in databases:
-            for schema in dbs['schema']:
-                for ds_name in schema['datasources']:
-                    fullname = utils.get_datasource_full_name(
-                        dbs['name'], ds_name, schema=schema['name'])
-                    db_ds_names.add(fullname)
+        db_ds_names = {
+            utils.get_datasource_full_name(
+                dbs['name'], ds_name, schema=schema['name'])
+            for dbs in databases
+            for schema in dbs['schema']
+            for ds_name in schema['datasources']
+        }
 
         existing_datasources = ConnectorRegistry.get_all_datasources(db.session)
         datasources = [
             d for d in existing_datasources if d.full_name in db_ds_names]
+
+        # Look up all the datasource_access permissions in a single query
+        pv_model = security_manager.permissionview_model
+        viewmenu_model = security_manager.viewmenu_model
+        permission_model = security_manager.permission_model
+        pvms = (
+            db.session.query(pv_model)
+            .join(viewmenu_model)
+            .join(permission_model)
+            .filter(
+                permission_model.name == 'datasource_access',
+                viewmenu_model.name.in_([d.perm for d in datasources]),
+            )
+        )
+        pvms = {pvm.view_menu.name: pvm for pvm in pvms}
+
         role = security_manager.find_role(role_name)
         # remove all permissions
         role.permissions = []
         # grant permissions to the list of datasources
         granted_perms = []
         for datasource in datasources:
-            view_menu_perm = security_manager.find_permission_view_menu(
-                view_menu_name=datasource.perm,
-                permission_name='datasource_access')
+            view_menu_perm = pvms.get(datasource.perm)
             # prevent creating empty permissions
             if view_menu_perm and view_menu_perm.view_menu:
                 role.permissions.append(view_menu_perm)
@@ -886,14 +1038,25 @@ class Superset(BaseSupersetView):
     @expose('/approve')
     def approve(self):
         def clean_fulfilled_requests(session):
-            for r in session.query(DAR).all():
-                datasource = ConnectorRegistry.get_datasource(
-                    r.datasource_type, r.datasource_id, session)
-                user = security_manager.get_user_by_id(r.created_by_fk)
+            access_requests = session.query(DAR).all()
+            datasources = ConnectorRegistry.get_datasources_by_key(
+                session,
+                [(r.datasource_type, r.datasource_id) for r in access_requests])
+            user_model = security_manager.user_model
+            users = {
+                u.id: u for u in
+                session.query(user_model)
+                .filter(user_model.id.in_({r.created_by_fk for r in access_requests}))
+            }
+            fulfilled_ids = []
+            for r in access_requests:
+                datasource = datasources.get((r.datasource_type, r.datasource_id))
+                user = users.get(r.created_by_fk)
                 if not datasource or \
                    security_manager.datasource_access(datasource, user):
                     # datasource does not exist anymore
-                    session.delete(r)
+                    fulfilled_ids.append(r.id)
+            delete_access_requests(session, fulfilled_ids)
             session.commit()
         datasource_type = request.args.get('datasource_type')
         datasource_id = request.args.get('datasource_id')
@@ -926,6 +1089,7 @@ class Superset(BaseSupersetView):
         if not requests:
             flash(ACCESS_REQUEST_MISSING_ERR, 'alert')
             return json_error_response(ACCESS_REQUEST_MISSING_ERR)
+        request_ids = [r.id for r in requests]
 
         # check if you can approve
         if security_manager.all_datasource_access() or g.user.id == datasource.owner_id:
@@ -961,8 +1125,7 @@ class Superset(BaseSupersetView):
             flash(__('You have no permission to approve this request'),
                   'danger')
             return redirect('/accessrequestsmodelview/list/')
-        for r in requests:
-            session.delete(r)
+        delete_access_requests(session, request_ids)
         session.commit()
         return redirect('/accessrequestsmodelview/list/')
 
@@ -979,7 +1142,7 @@ class Superset(BaseSupersetView):
 
         url_id = request.args.get('r')
         if url_id:
-            saved_url = db.session.query(models.Url).filter_by(id=url_id).first()
+            saved_url = db.session.query(models.Url).get(url_id)
             if saved_url:
                 url_str = parse.unquote_plus(
                     saved_url.url.split('?')[1][10:], encoding='utf-8', errors=None)
@@ -992,11 +1155,12 @@ class Superset(BaseSupersetView):
             # Converting old URLs
             form_data = cast_form_data(form_data)
 
-        form_data = {
-            k: v
-            for k, v in form_data.items()
-            if k not in FORM_DATA_KEY_BLACKLIST
-        }
+        if FORM_DATA_KEY_BLACKLIST:
+            form_data = {
+                k: v
+                for k, v in form_data.items()
+                if k not in FORM_DATA_KEY_BLACKLIST
+            }
 
         # When a slice_id is present, load from DB and override
         # the form_data from the DB with the other form_data provided
@@ -1004,7 +1168,7 @@ class Superset(BaseSupersetView):
         slc = None
 
         if slice_id:
-            slc = db.session.query(models.Slice).filter_by(id=slice_id).first()
+            slc = db.session.query(models.Slice).get(slice_id)
             slice_form_data = slc.form_data.copy()
             # allow form_data in request override slice from_data
             slice_form_data.update(form_data)
@@ -1042,12 +1206,12 @@ class Superset(BaseSupersetView):
     @expose('/slice/<slice_id>/')
     def slice(self, slice_id):
         form_data, slc = self.get_form_data(slice_id)
-        endpoint = '/superset/explore/?form_data={}'.format(
-            parse.quote(json.dumps(form_data)),
-        )
-        if request.args.get('standalone') == 'true':
-            endpoint += '&standalone=true'
-        return redirect(endpoint)
+        standalone = request.args.get('standalone') == 'true'
+        return redirect(url_for(
+            'Superset.explore',
+            form_data=utils.json_dumps_fast(form_data),
+            standalone='true' if standalone else None,
+        ))
 
     def get_query_string_response(self, viz_obj):
         query = None
@@ -1060,20 +1224,16 @@ class Superset(BaseSupersetView):
             return json_error_response(e)
 
         if query_obj and query_obj['prequeries']:
-            query_obj['prequeries'].append(query)
-            query = ';\n\n'.join(query_obj['prequeries'])
+            query = ';\n\n'.join(query_obj['prequeries'] + [query])
         if query:
             query += ';'
         else:
             query = 'No query.'
 
-        return Response(
-            json.dumps({
-                'query': query,
-                'language': viz_obj.datasource.query_language,
-            }),
-            status=200,
-            mimetype='application/json')
+        return json_success_fast({
+            'query': query,
+            'language': viz_obj.datasource.query_language,
+        })
 
     def generate_json(self, datasource_type, datasource_id, form_data,
                       csv=False, query=False, force=False):
@@ -1115,14 +1275,13 @@ class Superset(BaseSupersetView):
             logging.exception(e)
             return json_error_response(utils.error_msg_from_exception(e))
 
-        status = 200
         if (
             payload.get('status') == QueryStatus.FAILED or
             payload.get('error') is not None
         ):
-            status = 400
+            return json_success(viz_obj.json_dumps(payload), status=400)
 
-        return json_success(viz_obj.json_dumps(payload), status=status)
+        return json_conditional_success(viz_obj.json_dumps(payload))
 
     @log_this
     @has_access_api
@@ -1199,13 +1358,18 @@ class Superset(BaseSupersetView):
         if request.method == 'POST' and f:
             current_tt = int(time.time())
             data = json.loads(f.stream.read(), object_hook=utils.decode_dashboards)
-            # TODO: import DRUID datasources
-            for table in data['datasources']:
-                type(table).import_obj(table, import_time=current_tt)
-            db.session.commit()
-            for dashboard in data['dashboards']:
-                models.Dashboard.import_obj(
-                    dashboard, import_time=current_tt)
+            # Tables are only flushed so that a failing dashboard doesn't
+            # leave a half imported file behind
+            try:
+                # TODO: import DRUID datasources
+                for table in data['datasources']:
+                    type(table).import_obj(table, import_time=current_tt)
+                for dashboard in data['dashboards']:
+                    models.Dashboard.import_obj(
+                        dashboard, import_time=current_tt)
+            except Exception:
+                db.session.rollback()
+                raise
             db.session.commit()
             return redirect('/dashboardmodelview/list/')
         return self.render_template('superset/import_dashboards.html')
@@ -1228,9 +1392,9 @@ class Superset(BaseSupersetView):
         datasource_id & datasource_type used to be passed in the URL
         directory, now they should come as part of the form_data,
         This function allows supporting both without duplicating code"""
-        datasource = form_data.get('datasource', '')
-        if '__' in datasource:
-            datasource_id, datasource_type = datasource.split('__')
+        ds_id, sep, ds_type = form_data.get('datasource', '').partition('__')
+        if sep:
+            datasource_id, datasource_type = ds_id, ds_type
             # The case where the datasource has been deleted
             datasource_id = None if datasource_id == 'None' else datasource_id
 
@@ -1264,9 +1428,8 @@ class Superset(BaseSupersetView):
                 'danger')
             return redirect(
                 'superset/request_access/?'
-                'datasource_type={datasource_type}&'
-                'datasource_id={datasource_id}&'
-                ''.format(**locals()))
+                'datasource_type={}&'
+                'datasource_id={}&'.format(datasource_type, datasource_id))
 
         viz_type = form_data.get('viz_type')
         if not viz_type and datasource.default_endpoint:
@@ -1292,14 +1455,10 @@ class Superset(BaseSupersetView):
         action = request.args.get('action')
 
         if action == 'overwrite' and not slice_overwrite_perm:
-            return json_error_response(
-                _('You don\'t have the rights to ') + _('alter this ') + _('chart'),
-                status=400)
+            return json_error_response(CHART_ALTER_ERR, status=400)
 
         if action == 'saveas' and not slice_add_perm:
-            return json_error_response(
-                _('You don\'t have the rights to ') + _('create a ') + _('chart'),
-                status=400)
+            return json_error_response(CHART_CREATE_ERR, status=400)
 
         if action in ('saveas', 'overwrite'):
             return self.save_or_overwrite_slice(
@@ -1335,7 +1494,7 @@ class Superset(BaseSupersetView):
             title = 'Explore - ' + table_name
         return self.render_template(
             'superset/basic.html',
-            bootstrap_data=json.dumps(bootstrap_data),
+            bootstrap_data=utils.json_dumps_fast(bootstrap_data),
             entry='explore',
             title=title,
             standalone_mode=standalone)
@@ -1352,7 +1511,6 @@ class Superset(BaseSupersetView):
         :param column: Column name to retrieve values for
         :return:
         """
-        # TODO: Cache endpoint by user, datasource and column
         datasource = ConnectorRegistry.get_datasource(
             datasource_type, datasource_id, db.session)
         if not datasource:
@@ -1360,12 +1518,19 @@ class Superset(BaseSupersetView):
         if not security_manager.datasource_access(datasource):
             return json_error_response(DATASOURCE_ACCESS_ERR)
 
-        payload = json.dumps(
-            datasource.values_for_column(
-                column,
-                config.get('FILTER_SELECT_ROW_LIMIT', 10000),
-            ),
-            default=utils.json_int_dttm_ser)
+        # The values don't depend on the user, access was checked above
+        cache_key = 'superset/filter/{}/{}'.format(datasource.uid, column)
+        payload = cache.get(cache_key) if cache else None
+        if payload is None:
+            payload = utils.json_dumps_fast(
+                datasource.values_for_column(
+                    column,
+                    config.get('FILTER_SELECT_ROW_LIMIT', 10000),
+                ))
+            if cache:
+                cache.set(
+                    cache_key, payload,
+                    timeout=config.get('FILTER_SELECT_CACHE_TIMEOUT'))
         return json_success(payload)
 
     def save_or_overwrite_slice(
@@ -1405,10 +1570,7 @@ class Superset(BaseSupersetView):
             # check edit dashboard permissions
             dash_overwrite_perm = check_ownership(dash, raise_if_false=False)
             if not dash_overwrite_perm:
-                return json_error_response(
-                    _('You don\'t have the rights to ') + _('alter this ') +
-                    _('dashboard'),
-                    status=400)
+                return json_error_response(DASHBOARD_ALTER_ERR, status=400)
 
             flash(
                 'Slice [{}] was added to dashboard [{}]'.format(
@@ -1419,9 +1581,7 @@ class Superset(BaseSupersetView):
             # check create dashboard permissions
             dash_add_perm = security_manager.can_access('can_add', 'DashboardModelView')
             if not dash_add_perm:
-                return json_error_response(
-                    _('You don\'t have the rights to ') + _('create a ') + _('dashboard'),
-                    status=400)
+                return json_error_response(DASHBOARD_CREATE_ERR, status=400)
 
             dash = models.Dashboard(
                 dashboard_title=request.args.get('new_dashboard_name'),
@@ -1448,7 +1608,7 @@ class Superset(BaseSupersetView):
         if request.args.get('goto_dash') == 'true':
             response.update({'dashboard': dash.url})
 
-        return json_success(json.dumps(response))
+        return json_success_fast(response)
 
     def save_slice(self, slc):
         session = db.session()
@@ -1469,14 +1629,8 @@ class Superset(BaseSupersetView):
     @expose('/checkbox/<model_view>/<id_>/<attr>/<value>', methods=['GET'])
     def checkbox(self, model_view, id_, attr, value):
         """endpoint for checking/unchecking any boolean in a sqla model"""
-        modelview_to_model = {
-            'TableColumnInlineView':
-                ConnectorRegistry.sources['table'].column_class,
-            'DruidColumnInlineView':
-                ConnectorRegistry.sources['druid'].column_class,
-        }
-        model = modelview_to_model[model_view]
-        col = db.session.query(model).filter_by(id=id_).first()
+        model = MODELVIEW_TO_MODEL[model_view]
+        col = db.session.query(model).get(int(id_))
         checked = value == 'true'
         if col:
             setattr(col, attr, checked)
@@ -1491,16 +1645,12 @@ class Superset(BaseSupersetView):
     @expose('/schemas/<db_id>/')
     def schemas(self, db_id):
         db_id = int(db_id)
-        database = (
-            db.session
-            .query(models.Database)
-            .filter_by(id=db_id)
-            .one()
-        )
-        schemas = database.all_schema_names()
+        database = db.session.query(models.Database).get(db_id)
+        schemas = database.all_schema_names(
+            force=request.args.get('force') == 'true')
         schemas = security_manager.schemas_accessible_by_user(database, schemas)
         return Response(
-            json.dumps({'schemas': schemas}),
+            utils.json_dumps_fast({'schemas': schemas}),
             mimetype='application/json')
 
     @api
@@ -1511,16 +1661,22 @@ class Superset(BaseSupersetView):
         db_id = int(db_id)
         schema = utils.js_string_to_python(schema)
         substr = utils.js_string_to_python(substr)
-        database = db.session.query(models.Database).filter_by(id=db_id).one()
-        table_names = security_manager.accessible_by_user(
-            database, database.all_table_names(schema), schema)
-        view_names = security_manager.accessible_by_user(
-            database, database.all_view_names(schema), schema)
+        database = db.session.query(models.Database).get(db_id)
+        force = request.args.get('force') == 'true'
+        table_names = database.all_table_names(schema=schema, force=force)
+        view_names = database.all_view_names(schema=schema, force=force)
 
+        # Narrow down by substring first so the permission check only has
+        # to go through the names that can actually be returned
         if substr:
             table_names = [tn for tn in table_names if substr in tn]
             view_names = [vn for vn in view_names if substr in vn]
 
+        table_names = security_manager.accessible_by_user(
+            database, table_names, schema)
+        view_names = security_manager.accessible_by_user(
+            database, view_names, schema)
+
         max_items = config.get('MAX_TABLE_NAMES') or len(table_names)
         total_items = len(table_names) + len(view_names)
         max_tables = len(table_names)
@@ -1537,7 +1693,7 @@ class Superset(BaseSupersetView):
             'tableLength': len(table_names) + len(view_names),
             'options': table_options,
         }
-        return json_success(json.dumps(payload))
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -1547,10 +1703,7 @@ class Superset(BaseSupersetView):
         session = db.session()
         data = json.loads(request.form.get('data'))
         dash = models.Dashboard()
-        original_dash = (
-            session
-            .query(models.Dashboard)
-            .filter_by(id=dashboard_id).first())
+        original_dash = session.query(models.Dashboard).get(int(dashboard_id))
 
         dash.owners = [g.user] if g.user else []
         dash.dashboard_title = data['dashboard_title']
@@ -1590,7 +1743,7 @@ class Superset(BaseSupersetView):
         self._set_dash_metadata(dash, data)
         session.add(dash)
         session.commit()
-        dash_json = json.dumps(dash.data)
+        dash_json = utils.json_dumps_fast(dash.data)
         session.close()
         return json_success(dash_json)
 
@@ -1600,9 +1753,7 @@ class Superset(BaseSupersetView):
     def save_dash(self, dashboard_id):
         """Save a dashboard's metadata"""
         session = db.session()
-        dash = (session
-                .query(models.Dashboard)
-                .filter_by(id=dashboard_id).first())
+        dash = session.query(models.Dashboard).get(int(dashboard_id))
         check_ownership(dash, raise_if_false=True)
         data = json.loads(request.form.get('data'))
         self._set_dash_metadata(dash, data)
@@ -1625,10 +1776,9 @@ class Superset(BaseSupersetView):
 
         # @TODO remove upon v1 deprecation
         if not is_v2_dash:
-            positions = data['positions']
-            slice_ids = [int(d['slice_id']) for d in positions]
+            slice_ids = {int(d['slice_id']) for d in positions}
             dashboard.slices = [o for o in dashboard.slices if o.id in slice_ids]
-            positions = sorted(data['positions'], key=lambda x: int(x['slice_id']))
+            positions = sorted(positions, key=lambda x: int(x['slice_id']))
             dashboard.position_json = json.dumps(positions, indent=4, sort_keys=True)
             md = dashboard.params_dict
             dashboard.css = data['css']
@@ -1650,7 +1800,7 @@ class Superset(BaseSupersetView):
             return
 
         # find slices in the position data
-        slice_ids = []
+        slice_ids = set()
         slice_id_to_name = {}
         for value in positions.values():
             if (
@@ -1658,7 +1808,7 @@ class Superset(BaseSupersetView):
                 value.get('meta').get('chartId')
             ):
                 slice_id = value.get('meta').get('chartId')
-                slice_ids.append(slice_id)
+                slice_ids.add(slice_id)
                 slice_id_to_name[slice_id] = value.get('meta').get('sliceName')
 
         session = db.session()
@@ -1703,8 +1853,7 @@ class Superset(BaseSupersetView):
         data = json.loads(request.form.get('data'))
         session = db.session()
         Slice = models.Slice  # noqa
-        dash = (
-            session.query(models.Dashboard).filter_by(id=dashboard_id).first())
+        dash = session.query(models.Dashboard).get(int(dashboard_id))
         check_ownership(dash, raise_if_false=True)
         new_slices = session.query(Slice).filter(
             Slice.id.in_(data['slice_ids']))
@@ -1763,9 +1912,13 @@ class Superset(BaseSupersetView):
             if configuration:
                 connect_args['configuration'] = configuration
 
-            engine = create_engine(uri, connect_args=connect_args)
-            engine.connect()
-            return json_success(json.dumps(engine.table_names(), indent=4))
+            # Throwaway engine: list the tables over the single connection
+            # opened to test it, and don't keep it around in a pool
+            engine = create_engine(
+                uri, connect_args=connect_args, poolclass=NullPool)
+            with closing(engine.connect()) as conn:
+                table_names = engine.table_names(connection=conn)
+            return json_success(json.dumps(table_names, indent=4))
         except Exception as e:
             logging.exception(e)
             return json_error_response((
@@ -1785,15 +1938,8 @@ class Superset(BaseSupersetView):
             limit = 1000
 
         qry = (
-            db.session.query(M.Log, M.Dashboard, M.Slice)
-            .outerjoin(
-                M.Dashboard,
-                M.Dashboard.id == M.Log.dashboard_id,
-            )
-            .outerjoin(
-                M.Slice,
-                M.Slice.id == M.Log.slice_id,
-            )
+            db.session.query(
+                M.Log.action, M.Log.dttm, M.Log.dashboard_id, M.Log.slice_id)
             .filter(
                 sqla.and_(
                     ~M.Log.action.in_(('queries', 'shortner', 'sql_json')),
@@ -1803,25 +1949,42 @@ class Superset(BaseSupersetView):
             .order_by(M.Log.dttm.desc())
             .limit(limit)
         )
-        payload = []
-        for log in qry.all():
-            item_url = None
-            item_title = None
-            if log.Dashboard:
-                item_url = log.Dashboard.url
-                item_title = log.Dashboard.dashboard_title
-            elif log.Slice:
-                item_url = log.Slice.slice_url
-                item_title = log.Slice.slice_name
+        logs = qry.all()
+
+        # Log rows tend to point at the same few dashboards and slices, so
+        # rather than joining them onto every row, load each one once and
+        # resolve its url (which parses json_metadata) once as well
+        dashboard_ids = {log.dashboard_id for log in logs if log.dashboard_id}
+        slice_ids = {log.slice_id for log in logs if log.slice_id}
+        dashboards = {}
+        if dashboard_ids:
+            dashboards = {
+                dash.id: (dash.url, dash.dashboard_title)
+                for dash in db.session.query(M.Dashboard).filter(
+                    M.Dashboard.id.in_(dashboard_ids))
+            }
+        slices = {}
+        if slice_ids:
+            slices = {
+                slc.id: (slc.slice_url, slc.slice_name)
+                for slc in db.session.query(M.Slice).filter(
+                    M.Slice.id.in_(slice_ids))
+            }
 
+        payload = []
+        for log_action, dttm, dashboard_id, slice_id in logs:
+            item_url, item_title = (
+                dashboards.get(dashboard_id) or
+                slices.get(slice_id) or
+                (None, None)
+            )
             payload.append({
-                'action': log.Log.action,
+                'action': log_action,
                 'item_url': item_url,
                 'item_title': item_title,
-                'time': log.Log.dttm,
+                'time': dttm,
             })
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -1860,24 +2023,25 @@ class Superset(BaseSupersetView):
             .order_by(
                 models.FavStar.dttm.desc(),
             )
+            # Creators are listed with each item, fetch them in the same query
+            .options(joinedload(models.Dashboard.created_by))
         )
         payload = []
-        for o in qry.all():
+        for dash, dttm in qry.all():
             d = {
-                'id': o.Dashboard.id,
-                'dashboard': o.Dashboard.dashboard_link(),
-                'title': o.Dashboard.dashboard_title,
-                'url': o.Dashboard.url,
-                'dttm': o.dttm,
+                'id': dash.id,
+                'dashboard': dash.dashboard_link(),
+                'title': dash.dashboard_title,
+                'url': dash.url,
+                'dttm': dttm,
             }
-            if o.Dashboard.created_by:
-                user = o.Dashboard.created_by
+            if dash.created_by:
+                user = dash.created_by
                 d['creator'] = str(user)
                 d['creator_url'] = '/superset/profile/{}/'.format(
                     user.username)
             payload.append(d)
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -1905,8 +2069,7 @@ class Superset(BaseSupersetView):
             'url': o.url,
             'dttm': o.changed_on,
         } for o in qry.all()]
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -1937,15 +2100,14 @@ class Superset(BaseSupersetView):
             .order_by(Slice.slice_name.asc())
         )
         payload = [{
-            'id': o.Slice.id,
-            'title': o.Slice.slice_name,
-            'url': o.Slice.slice_url,
-            'data': o.Slice.form_data,
-            'dttm': o.dttm if o.dttm else o.Slice.changed_on,
-            'viz_type': o.Slice.viz_type,
-        } for o in qry.all()]
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+            'id': slc.id,
+            'title': slc.slice_name,
+            'url': slc.slice_url,
+            'data': slc.form_data,
+            'dttm': dttm if dttm else slc.changed_on,
+            'viz_type': slc.viz_type,
+        } for slc, dttm in qry.all()]
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -1956,8 +2118,11 @@ class Superset(BaseSupersetView):
         if not user_id:
             user_id = g.user.id
         Slice = models.Slice  # noqa
+        # Only a few columns are listed, select those rather than whole
+        # slices with their params and query context
         qry = (
-            db.session.query(Slice)
+            db.session.query(
+                Slice.id, Slice.slice_name, Slice.changed_on, Slice.viz_type)
             .filter(
                 sqla.or_(
                     Slice.created_by_fk == user_id,
@@ -1967,14 +2132,13 @@ class Superset(BaseSupersetView):
             .order_by(Slice.changed_on.desc())
         )
         payload = [{
-            'id': o.id,
-            'title': o.slice_name,
-            'url': o.slice_url,
-            'dttm': o.changed_on,
-            'viz_type': o.viz_type,
-        } for o in qry.all()]
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+            'id': slice_id,
+            'title': slice_name,
+            'url': models.get_explore_url(slice_id),
+            'dttm': changed_on,
+            'viz_type': viz_type,
+        } for slice_id, slice_name, changed_on, viz_type in qry.all()]
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -2000,24 +2164,25 @@ class Superset(BaseSupersetView):
             .order_by(
                 models.FavStar.dttm.desc(),
             )
+            # Creators are listed with each item, fetch them in the same query
+            .options(joinedload(models.Slice.created_by))
         )
         payload = []
-        for o in qry.all():
+        for slc, dttm in qry.all():
             d = {
-                'id': o.Slice.id,
-                'title': o.Slice.slice_name,
-                'url': o.Slice.slice_url,
-                'dttm': o.dttm,
-                'viz_type': o.Slice.viz_type,
+                'id': slc.id,
+                'title': slc.slice_name,
+                'url': slc.slice_url,
+                'dttm': dttm,
+                'viz_type': slc.viz_type,
             }
-            if o.Slice.created_by:
-                user = o.Slice.created_by
+            if slc.created_by:
+                user = slc.created_by
                 d['creator'] = str(user)
                 d['creator_url'] = '/superset/profile/{}/'.format(
                     user.username)
             payload.append(d)
-        return json_success(
-            json.dumps(payload, default=utils.json_int_dttm_ser))
+        return json_success_fast(payload)
 
     @api
     @has_access_api
@@ -2048,26 +2213,52 @@ class Superset(BaseSupersetView):
                 session.query(SqlaTable)
                 .join(models.Database)
                 .filter(
-                    models.Database.database_name == db_name or
+                    models.Database.database_name == db_name,
                     SqlaTable.table_name == table_name)
             ).first()
             if not table:
                 return json_error_response(__(
                     "Table %(t)s wasn't found in the database %(d)s",
-                    t=table_name, s=db_name), status=404)
+                    t=table_name, d=db_name), status=404)
             slices = session.query(models.Slice).filter_by(
                 datasource_id=table.id,
                 datasource_type=table.type).all()
 
-        for slc in slices:
+        # Charts are refreshed concurrently since each one mostly waits on
+        # its datasource. Every task runs in its own copy of the request
+        # context, and so with its own db.session, slice and user objects
+        user_id = getattr(g.user, 'id', None)
+        anonymous_user = g.user if user_id is None else None
+
+        def warm_up_task(slice_id):
+            @copy_current_request_context
+            def warm_up():
+                try:
+                    if user_id is None:
+                        g.user = anonymous_user
+                    else:
+                        g.user = security_manager.get_user_by_id(user_id)
+                    slc = db.session.query(models.Slice).get(slice_id)
+                    slc.get_viz(force=True).get_json()
+                except Exception as e:
+                    return utils.error_msg_from_exception(e)
+            return warm_up
+
+        tasks = [warm_up_task(slc.id) for slc in slices]
+        if tasks:
+            pool = ThreadPool(
+                min(config.get('WARM_UP_CACHE_WORKERS') or 1, len(tasks)))
             try:
-                obj = slc.get_viz(force=True)
-                obj.get_json()
-            except Exception as e:
-                return json_error_response(utils.error_msg_from_exception(e))
-        return json_success(json.dumps(
+                errors = pool.map(lambda task: task(), tasks)
+            finally:
+                pool.close()
+                pool.join()
+            for error in errors:
+                if error:
+                    return json_error_response(error)
+        return json_success_fast(
             [{'slice_id': slc.id, 'slice_name': slc.slice_name}
-             for slc in slices]))
+             for slc in slices])
 
     @expose('/favstar/<class_name>/<obj_id>/<action>/')
     def favstar(self, class_name, obj_id, action):
@@ -2075,11 +2266,11 @@ class Superset(BaseSupersetView):
         session = db.session()
         FavStar = models.FavStar  # noqa
         count = 0
-        favs = session.query(FavStar).filter_by(
+        qry = session.query(FavStar).filter_by(
             class_name=class_name, obj_id=obj_id,
-            user_id=g.user.get_id()).all()
+            user_id=g.user.get_id())
         if action == 'select':
-            if not favs:
+            if not qry.count():
                 session.add(
                     FavStar(
                         class_name=class_name,
@@ -2090,12 +2281,11 @@ class Superset(BaseSupersetView):
                 )
             count = 1
         elif action == 'unselect':
-            for fav in favs:
-                session.delete(fav)
+            qry.delete(synchronize_session=False)
         else:
-            count = len(favs)
+            count = qry.count()
         session.commit()
-        return json_success(json.dumps({'count': count}))
+        return json_success_fast({'count': count})
 
     @has_access
     @expose('/dashboard/<dashboard_id>/')
@@ -2109,11 +2299,7 @@ class Superset(BaseSupersetView):
             qry = qry.filter_by(slug=dashboard_id)
 
         dash = qry.one()
-        datasources = set()
-        for slc in dash.slices:
-            datasource = slc.datasource
-            if datasource:
-                datasources.add(datasource)
+        datasources = {ds for ds in dash.datasources if ds}
 
         if config.get('ENABLE_ACCESS_REQUEST'):
             for datasource in datasources:
@@ -2123,7 +2309,7 @@ class Superset(BaseSupersetView):
                         'danger')
                     return redirect(
                         'superset/request_access/?'
-                        'dashboard_id={dash.id}&'.format(**locals()))
+                        'dashboard_id={}&'.format(dash.id))
 
         dash_edit_perm = check_ownership(dash, raise_if_false=False) and \
             security_manager.can_access('can_save_dash', 'Superset')
@@ -2144,7 +2330,8 @@ class Superset(BaseSupersetView):
         # if layout == v2 (not backwards compatible)
         #   view = v2
         #   edit = v2
-        dashboard_layout = dash.data.get('position_json', {})
+        dashboard_data = dash.data
+        dashboard_layout = dashboard_data.get('position_json', {})
         is_v2_dash = (
             isinstance(dashboard_layout, dict) and
             dashboard_layout.get('DASHBOARD_VERSION_KEY') == 'v2'
@@ -2185,7 +2372,6 @@ class Superset(BaseSupersetView):
             force_v2_edit=force_v2_edit,
             edit_mode=edit_mode)
 
-        dashboard_data = dash.data
         dashboard_data.update({
             'standalone_mode': standalone_mode,
             'dash_save_perm': dash_save_perm,
@@ -2208,7 +2394,7 @@ class Superset(BaseSupersetView):
         }
 
         if request.args.get('json') == 'true':
-            return json_success(json.dumps(bootstrap_data))
+            return json_success_fast(bootstrap_data)
 
         if dashboard_view == 'v2':
             entry = 'dashboard'
@@ -2222,7 +2408,7 @@ class Superset(BaseSupersetView):
             entry=entry,
             standalone_mode=standalone_mode,
             title=dash.dashboard_title,
-            bootstrap_data=json.dumps(bootstrap_data),
+            bootstrap_data=utils.json_dumps_fast(bootstrap_data),
         )
 
     @api
@@ -2288,9 +2474,10 @@ class Superset(BaseSupersetView):
     @log_this
     def sqllab_viz(self):
         SqlaTable = ConnectorRegistry.sources['table']
-        data = json.loads(request.form.get('data'))
+        TableColumn = SqlaTable.column_class
+        SqlMetric = SqlaTable.metric_class
+        data = utils.json_loads_fast(request.form.get('data'))
         table_name = data.get('datasourceName')
-        template_params = data.get('templateParams')
         table = (
             db.session.query(SqlaTable)
             .filter_by(table_name=table_name)
@@ -2310,9 +2497,6 @@ class Superset(BaseSupersetView):
         metrics = []
         for column_name, config in data.get('columns').items():
             is_dim = config.get('is_dim', False)
-            SqlaTable = ConnectorRegistry.sources['table']
-            TableColumn = SqlaTable.column_class
-            SqlMetric = SqlaTable.metric_class
             col = TableColumn(
                 column_name=column_name,
                 filterable=is_dim,
@@ -2327,19 +2511,18 @@ class Superset(BaseSupersetView):
             if agg:
                 if agg == 'count_distinct':
                     metrics.append(SqlMetric(
-                        metric_name='{agg}__{column_name}'.format(**locals()),
-                        expression='COUNT(DISTINCT {column_name})'
-                        .format(**locals()),
+                        metric_name='{}__{}'.format(agg, column_name),
+                        expression='COUNT(DISTINCT {})'.format(column_name),
                     ))
                 else:
                     metrics.append(SqlMetric(
-                        metric_name='{agg}__{column_name}'.format(**locals()),
-                        expression='{agg}({column_name})'.format(**locals()),
+                        metric_name='{}__{}'.format(agg, column_name),
+                        expression='{}({})'.format(agg, column_name),
                     ))
         if not metrics:
             metrics.append(SqlMetric(
-                metric_name='count'.format(**locals()),
-                expression='count(*)'.format(**locals()),
+                metric_name='count',
+                expression='count(*)',
             ))
         table.columns = cols
         table.metrics = metrics
@@ -2353,16 +2536,19 @@ class Superset(BaseSupersetView):
     @log_this
     def table(self, database_id, table_name, schema):
         schema = utils.js_string_to_python(schema)
-        mydb = db.session.query(models.Database).filter_by(id=database_id).one()
+        mydb = db.session.query(models.Database).get(int(database_id))
         payload_columns = []
         indexes = []
         primary_key = []
         foreign_keys = []
         try:
-            columns = mydb.get_columns(table_name, schema)
-            indexes = mydb.get_indexes(table_name, schema)
-            primary_key = mydb.get_pk_constraint(table_name, schema)
-            foreign_keys = mydb.get_foreign_keys(table_name, schema)
+            # One inspector for all four, it caches what it reflects so
+            # dialects that describe the whole table once can reuse it
+            inspector = mydb.inspector
+            columns = inspector.get_columns(table_name, schema)
+            indexes = inspector.get_indexes(table_name, schema)
+            primary_key = inspector.get_pk_constraint(table_name, schema)
+            foreign_keys = inspector.get_foreign_keys(table_name, schema)
         except Exception as e:
             return json_error_response(utils.error_msg_from_exception(e))
         keys = []
@@ -2378,6 +2564,11 @@ class Superset(BaseSupersetView):
             idx['type'] = 'index'
         keys += indexes
 
+        keys_by_column = defaultdict(list)
+        for k in keys:
+            for column_name in set(k.get('column_names')):
+                keys_by_column[column_name].append(k)
+
         for col in columns:
             dtype = ''
             try:
@@ -2386,12 +2577,9 @@ class Superset(BaseSupersetView):
                 pass
             payload_columns.append({
                 'name': col['name'],
-                'type': dtype.split('(')[0] if '(' in dtype else dtype,
+                'type': dtype.partition('(')[0],
                 'longType': dtype,
-                'keys': [
-                    k for k in keys
-                    if col['name'] in k.get('column_names')
-                ],
+                'keys': keys_by_column.get(col['name'], []),
             })
         tbl = {
             'name': table_name,
@@ -2403,32 +2591,43 @@ class Superset(BaseSupersetView):
             'foreignKeys': foreign_keys,
             'indexes': keys,
         }
-        return json_success(json.dumps(tbl))
+        return json_conditional_success(
+            utils.json_dumps_fast(tbl, raw=True), max_age=TABLE_METADATA_MAX_AGE)
 
     @has_access
     @expose('/extra_table_metadata/<database_id>/<table_name>/<schema>/')
     @log_this
     def extra_table_metadata(self, database_id, table_name, schema):
         schema = utils.js_string_to_python(schema)
-        mydb = db.session.query(models.Database).filter_by(id=database_id).one()
+        mydb = db.session.query(models.Database).get(int(database_id))
         payload = mydb.db_engine_spec.extra_table_metadata(
             mydb, table_name, schema)
-        return json_success(json.dumps(payload))
+        return json_conditional_success(
+            utils.json_dumps_fast(payload, raw=True), max_age=TABLE_METADATA_MAX_AGE)
 
     @has_access
     @expose('/select_star/<database_id>/<table_name>/')
     @log_this
     def select_star(self, database_id, table_name):
-        mydb = db.session.query(
-            models.Database).filter_by(id=database_id).first()
+        mydb = db.session.query(models.Database).get(int(database_id))
+        use_cache = cache and select_star_is_cacheable(mydb)
+        cache_key = select_star_cache_key(mydb.id, table_name)
+        content = cache.get(cache_key) if use_cache else None
+        if content is None:
+            content = mydb.select_star(table_name, show_cols=True)
+            if use_cache:
+                cache.set(cache_key, content, timeout=SELECT_STAR_CACHE_TIMEOUT)
         return self.render_template(
             'superset/ajah.html',
-            content=mydb.select_star(table_name, show_cols=True),
+            content=content,
         )
 
     @expose('/theme/')
     def theme(self):
-        return self.render_template('superset/theme.html')
+        resp = make_response(self.render_template('superset/theme.html'))
+        resp.cache_control.public = True
+        resp.cache_control.max_age = THEME_MAX_AGE
+        return resp
 
     @has_access_api
     @expose('/cached_key/<key>/')
@@ -2437,7 +2636,9 @@ class Superset(BaseSupersetView):
         """Returns a key from the cache"""
         resp = cache.get(key)
         if resp:
-            return resp
+            resp = make_response(resp)
+            resp.add_etag()
+            return resp.make_conditional(request)
         return 'nope'
 
     @has_access_api
@@ -2445,10 +2646,10 @@ class Superset(BaseSupersetView):
     @log_this
     def cache_key_exist(self, key):
         """Returns if a key from cache exist"""
-        key_exist = True if cache.get(key) else False
+        # ``has`` asks the backend without fetching and unpickling the value
+        key_exist = cache.cache.has(key)
         status = 200 if key_exist else 404
-        return json_success(json.dumps({'key_exist': key_exist}),
-                            status=status)
+        return json_success_fast({'key_exist': key_exist}, status=status)
 
     @has_access_api
     @expose('/results/<key>/')
@@ -2466,7 +2667,7 @@ class Superset(BaseSupersetView):
                 status=410,
             )
 
-        query = db.session.query(Query).filter_by(results_key=key).one()
+        query = get_query_by(Query.results_key, key)
         rejected_tables = security_manager.rejected_datasources(
             query.sql, query.database, query.schema)
         if rejected_tables:
@@ -2474,13 +2675,13 @@ class Superset(BaseSupersetView):
                 '{}'.format(rejected_tables)))
 
         payload = utils.zlib_decompress_to_string(blob)
-        display_limit = app.config.get('DISPLAY_SQL_MAX_ROW', None)
-        if display_limit:
-            payload_json = json.loads(payload)
-            payload_json['data'] = payload_json['data'][:display_limit]
-        return json_success(
-            json.dumps(
-                payload_json, default=utils.json_iso_dttm_ser, ignore_nan=True))
+        if not DISPLAY_SQL_MAX_ROW or (
+                query.rows is not None and query.rows <= DISPLAY_SQL_MAX_ROW):
+            # Nothing to truncate, serve the stored payload without parsing it
+            return json_success(payload)
+        payload_json = utils.json_loads_fast(payload)
+        payload_json['data'] = payload_json['data'][:DISPLAY_SQL_MAX_ROW]
+        return json_success_fast(payload_json, default=utils.json_iso_dttm_ser)
 
     @has_access_api
     @expose('/stop_query/', methods=['POST'])
@@ -2488,11 +2689,13 @@ class Superset(BaseSupersetView):
     def stop_query(self):
         client_id = request.form.get('client_id')
         try:
-            query = (
+            (
                 db.session.query(Query)
-                .filter_by(client_id=client_id).one()
+                .filter_by(client_id=client_id)
+                .update(
+                    {Query.status: utils.QueryStatus.STOPPED},
+                    synchronize_session=False)
             )
-            query.status = utils.QueryStatus.STOPPED
             db.session.commit()
         except Exception:
             pass
@@ -2507,11 +2710,12 @@ class Superset(BaseSupersetView):
         sql = request.form.get('sql')
         database_id = request.form.get('database_id')
         schema = request.form.get('schema') or None
-        template_params = json.loads(
-            request.form.get('templateParams') or '{}')
+        template_params = request.form.get('templateParams')
+        template_params = (
+            utils.json_loads_fast(template_params) if template_params else {})
 
         session = db.session()
-        mydb = session.query(models.Database).filter_by(id=database_id).first()
+        mydb = session.query(models.Database).get(database_id)
 
         if not mydb:
             json_error_response(
@@ -2521,7 +2725,6 @@ class Superset(BaseSupersetView):
         if rejected_tables:
             return json_error_response(get_datasource_access_error_msg(
                 '{}'.format(rejected_tables)))
-        session.commit()
 
         select_as_cta = request.form.get('select_as_cta') == 'true'
         tmp_table_name = request.form.get('tmp_table_name')
@@ -2546,9 +2749,11 @@ class Superset(BaseSupersetView):
             client_id=request.form.get('client_id'),
         )
         session.add(query)
+        # Read the id before committing, the commit expires the instance and
+        # reading it afterwards would cost another SELECT
         session.flush()
         query_id = query.id
-        session.commit()  # shouldn't be necessary
+        session.commit()
         if not query_id:
             raise Exception(_('Query record was not created as expected.'))
         logging.info('Triggering query_id: {}'.format(query_id))
@@ -2586,18 +2791,17 @@ class Superset(BaseSupersetView):
                 session.commit()
                 return json_error_response('{}'.format(msg))
 
-            resp = json_success(json.dumps(
-                {'query': query.to_dict()}, default=utils.json_int_dttm_ser,
-                ignore_nan=True), status=202)
+            resp = json_success_fast(
+                {'query': query.to_dict()}, status=202)
             session.commit()
             return resp
 
         # Sync request.
         try:
-            timeout = config.get('SQLLAB_TIMEOUT')
+            timeout = SQLLAB_TIMEOUT
             timeout_msg = (
-                'The query exceeded the {timeout} seconds '
-                'timeout.').format(**locals())
+                'The query exceeded the {} seconds '
+                'timeout.').format(timeout)
             with utils.timeout(seconds=timeout,
                                error_message=timeout_msg):
                 # pylint: disable=no-value-for-parameter
@@ -2605,11 +2809,11 @@ class Superset(BaseSupersetView):
                     query_id,
                     rendered_query,
                     return_results=True)
-            payload = json.dumps(
+            payload = utils.json_dumps_fast(
                 data,
                 default=utils.pessimistic_json_iso_dttm_ser,
-                ignore_nan=True,
                 encoding=None,
+                raw=True,
             )
         except Exception as e:
             logging.exception(e)
@@ -2624,11 +2828,7 @@ class Superset(BaseSupersetView):
     def csv(self, client_id):
         """Download the query results as csv."""
         logging.info('Exporting CSV file [{}]'.format(client_id))
-        query = (
-            db.session.query(Query)
-            .filter_by(client_id=client_id)
-            .one()
-        )
+        query = get_query_by(Query.client_id, client_id)
 
         rejected_tables = security_manager.rejected_datasources(
             query.sql, query.database, query.schema)
@@ -2644,17 +2844,20 @@ class Superset(BaseSupersetView):
         if blob:
             logging.info('Decompressing')
             json_payload = utils.zlib_decompress_to_string(blob)
-            obj = json.loads(json_payload)
+            obj = utils.json_loads_fast(json_payload)
             columns = [c['name'] for c in obj['columns']]
             df = pd.DataFrame.from_records(obj['data'], columns=columns)
-            logging.info('Using pandas to convert to CSV')
-            csv = df.to_csv(index=False, **config.get('CSV_EXPORT'))
+            csv = utils.iter_df_to_csv(
+                df, index=False, **config.get('CSV_EXPORT'))
         else:
+            # Rows are fetched from the cursor while the response is being
+            # streamed, rather than loading the whole result set up front
             logging.info('Running a query to turn into CSV')
             sql = query.select_sql or query.executed_sql
-            df = query.database.get_df(sql, query.schema)
-            # TODO(bkyryliuk): add compression=gzip for big files.
-            csv = df.to_csv(index=False, **config.get('CSV_EXPORT'))
+            dfs = query.database.iter_df(sql, query.schema)
+            csv = stream_with_context(utils.iter_dfs_to_csv(
+                dfs, index=False, **config.get('CSV_EXPORT')))
+        # TODO(bkyryliuk): add compression=gzip for big files.
         response = Response(csv, mimetype='text/csv')
         response.headers['Content-Disposition'] = (
             'attachment; filename={}.csv'.format(unidecode(query.name)))
@@ -2676,7 +2879,7 @@ class Superset(BaseSupersetView):
         # Check permission for datasource
         if not security_manager.datasource_access(datasource):
             return json_error_response(DATASOURCE_ACCESS_ERR)
-        return json_success(json.dumps(datasource.data))
+        return json_success_fast(datasource.data)
 
     @expose('/queries/<last_updated_ms>')
     def queries(self, last_updated_ms):
@@ -2694,6 +2897,7 @@ class Superset(BaseSupersetView):
 
         sql_queries = (
             db.session.query(Query)
+            .options(*QUERY_TO_DICT_OPTIONS)
             .filter(
                 Query.user_id == g.user.get_id(),
                 Query.changed_on >= last_updated_dt,
@@ -2702,43 +2906,46 @@ class Superset(BaseSupersetView):
         )
         dict_queries = {q.client_id: q.to_dict() for q in sql_queries}
 
-        now = int(round(time.time() * 1000))
+        # Unfinished queries started before this are considered timed out
+        cutoff = int(round(time.time() * 1000)) - SQLLAB_ASYNC_TIME_LIMIT_MS
 
-        unfinished_states = [
+        unfinished_states = frozenset([
             utils.QueryStatus.PENDING,
             utils.QueryStatus.RUNNING,
-        ]
+        ])
 
         queries_to_timeout = [
             client_id for client_id, query_dict in dict_queries.items()
             if (
-                query_dict['state'] in unfinished_states and (
-                    now - query_dict['startDttm'] >
-                    config.get('SQLLAB_ASYNC_TIME_LIMIT_SEC') * 1000
-                )
+                query_dict['state'] in unfinished_states and
+                query_dict['startDttm'] < cutoff
             )
         ]
 
         if queries_to_timeout:
-            update(Query).where(
-                and_(
+            (
+                db.session.query(Query)
+                .filter(
                     Query.user_id == g.user.get_id(),
-                    Query.client_id in queries_to_timeout,
-                ),
-            ).values(state=utils.QueryStatus.TIMED_OUT)
+                    Query.client_id.in_(queries_to_timeout),
+                )
+                .update(
+                    {Query.status: utils.QueryStatus.TIMED_OUT},
+                    synchronize_session=False)
+            )
+            db.session.commit()
 
             for client_id in queries_to_timeout:
-                dict_queries[client_id]['status'] = utils.QueryStatus.TIMED_OUT
+                dict_queries[client_id]['state'] = utils.QueryStatus.TIMED_OUT
 
-        return json_success(
-            json.dumps(dict_queries, default=utils.json_int_dttm_ser))
+        return json_success_fast(dict_queries)
 
     @has_access
     @expose('/search_queries')
     @log_this
     def search_queries(self):
         """Search for queries."""
-        query = db.session.query(Query)
+        query = db.session.query(Query).options(*QUERY_TO_DICT_OPTIONS)
         search_user_id = request.args.get('user_id')
         database_id = request.args.get('database_id')
         search_text = request.args.get('search_text')
@@ -2780,7 +2987,7 @@ class Superset(BaseSupersetView):
         dict_queries = [q.to_dict() for q in sql_queries]
 
         return Response(
-            json.dumps(dict_queries, default=utils.json_int_dttm_ser),
+            utils.json_dumps_fast(dict_queries),
             status=200,
             mimetype='application/json')
 
@@ -2806,7 +3013,8 @@ class Superset(BaseSupersetView):
             'superset/basic.html',
             entry='welcome',
             title='Superset',
-            bootstrap_data=json.dumps(payload, default=utils.json_iso_dttm_ser),
+            bootstrap_data=utils.json_dumps_fast(
+                payload, default=utils.json_iso_dttm_ser),
         )
 
     @has_access
@@ -2825,7 +3033,8 @@ class Superset(BaseSupersetView):
             'superset/basic.html',
             title=username + "'s profile",
             entry='profile',
-            bootstrap_data=json.dumps(payload, default=utils.json_iso_dttm_ser),
+            bootstrap_data=utils.json_dumps_fast(
+                payload, default=utils.json_iso_dttm_ser),
         )
 
     @has_access
@@ -2839,7 +3048,8 @@ class Superset(BaseSupersetView):
         return self.render_template(
             'superset/basic.html',
             entry='sqllab',
-            bootstrap_data=json.dumps(d, default=utils.json_iso_dttm_ser),
+            bootstrap_data=utils.json_dumps_fast(
+                d, default=utils.json_iso_dttm_ser),
         )
 
     @api
@@ -2922,7 +3132,7 @@ appbuilder.add_separator('Sources')
 @app.after_request
 def apply_caching(response):
     """Applies the configuration's http headers to all responses"""
-    for k, v in config.get('HTTP_HEADERS').items():
+    for k, v in HTTP_HEADERS:
         response.headers[k] = v
     return response
 
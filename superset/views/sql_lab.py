@@ -7,18 +7,23 @@ from __future__ import unicode_literals
 
 from flask import g, redirect
 from flask_appbuilder import expose
-from flask_appbuilder.models.sqla.interface import SQLAInterface
 from flask_babel import gettext as __
 from flask_babel import lazy_gettext as _
+from sqlalchemy.orm import joinedload
 
 from superset import appbuilder
 from superset.models.sql_lab import Query, SavedQuery
-from .base import BaseSupersetView, DeleteMixin, SupersetModelView
+from .base import (
+    BaseSupersetView, DeleteMixin, SupersetModelView, SupersetSQLAInterface,
+)
 
 
 class QueryView(SupersetModelView):
-    datamodel = SQLAInterface(Query)
+    datamodel = SupersetSQLAInterface(
+        Query,
+        list_load_options=(joinedload(Query.user), joinedload(Query.database)))
     list_columns = ['user', 'database', 'status', 'start_time', 'end_time']
+    search_columns = ('user', 'database', 'status', 'start_time', 'end_time')
     label_columns = {
         'user': _('User'),
         'database': _('Database'),
@@ -38,7 +43,10 @@ appbuilder.add_view(
 
 
 class SavedQueryView(SupersetModelView, DeleteMixin):
-    datamodel = SQLAInterface(SavedQuery)
+    datamodel = SupersetSQLAInterface(
+        SavedQuery,
+        list_load_options=(
+            joinedload(SavedQuery.user), joinedload(SavedQuery.database)))
 
     list_title = _('List Saved Query')
     show_title = _('Show Saved Query')
@@ -9,8 +9,38 @@ from collections import defaultdict
 
 from flask import g
 from flask_appbuilder.security.sqla import models as ab_models
+from sqlalchemy.orm import subqueryload
 
-from superset import db
+from superset import cache, db, db_engine_specs
+
+# Rendering a table's SELECT * reflects its columns, kept short so DDL
+# run outside of Superset shows up soon
+SELECT_STAR_CACHE_TIMEOUT = 5 * 60
+
+
+def select_star_cache_key(database_id, table_name):
+    return 'superset/select_star/{}/{}'.format(database_id, table_name)
+
+
+def select_star_is_cacheable(database):
+    """Engines that filter SELECT * on the latest partition (Presto, Hive)
+    would serve a stale partition from the cache, those aren't cached"""
+    where_latest_partition = (
+        database.db_engine_spec.where_latest_partition.__func__)
+    return where_latest_partition is (
+        db_engine_specs.BaseEngineSpec.where_latest_partition.__func__)
+
+
+def clear_select_star_cache(table):
+    """Drops a table's cached SELECT *, under either name it's requested by"""
+    if not cache:
+        return
+    table_names = [table.table_name]
+    if table.schema:
+        table_names.append('{}.{}'.format(table.schema, table.table_name))
+    cache.delete_many(*[
+        select_star_cache_key(table.database_id, table_name)
+        for table_name in table_names])
 
 
 def bootstrap_user_data(username=None, include_perms=False):
@@ -19,11 +49,19 @@ def bootstrap_user_data(username=None, include_perms=False):
     else:
         username = g.user.username
 
-    user = (
-        db.session.query(ab_models.User)
-        .filter_by(username=username)
-        .one()
-    )
+    query = db.session.query(ab_models.User).filter_by(username=username)
+    if include_perms:
+        # Load the roles' permissions in a fixed number of queries rather
+        # than lazily, one or more per role and permission
+        permissions = (
+            subqueryload(ab_models.User.roles)
+            .subqueryload(ab_models.Role.permissions)
+        )
+        query = query.options(
+            permissions.joinedload(ab_models.PermissionView.permission),
+            permissions.joinedload(ab_models.PermissionView.view_menu),
+        )
+    user = query.one()
 
     payload = {
         'username': user.username,
@@ -50,19 +88,13 @@ def get_permissions(user):
     roles = {}
     permissions = defaultdict(set)
     for role in user.roles:
-        perms = set()
+        role_perms = []
         for perm in role.permissions:
             if perm.permission and perm.view_menu:
-                perms.add(
-                    (perm.permission.name, perm.view_menu.name),
-                )
+                role_perms.append([perm.permission.name, perm.view_menu.name])
                 if perm.permission.name in ('datasource_access',
                                             'database_access'):
                     permissions[perm.permission.name].add(perm.view_menu.name)
-        roles[role.name] = [
-            [perm.permission.name, perm.view_menu.name]
-            for perm in role.permissions
-            if perm.permission and perm.view_menu
-        ]
+        roles[role.name] = role_perms
 
     return roles, permissions
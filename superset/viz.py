@@ -322,9 +322,7 @@ class BaseViz(object):
         return config.get('CACHE_DEFAULT_TIMEOUT')
 
     def get_json(self):
-        return json.dumps(
-            self.get_payload(),
-            default=utils.json_int_dttm_ser, ignore_nan=True)
+        return utils.json_dumps_fast(self.get_payload())
 
     def cache_key(self, query_obj):
         """
@@ -446,12 +444,7 @@ class BaseViz(object):
         }
 
     def json_dumps(self, obj, sort_keys=False):
-        return json.dumps(
-            obj,
-            default=utils.json_int_dttm_ser,
-            ignore_nan=True,
-            sort_keys=sort_keys,
-        )
+        return utils.json_dumps_fast(obj, sort_keys=sort_keys)
 
     @property
     def data(self):
@@ -467,7 +460,8 @@ class BaseViz(object):
     def get_csv(self):
         df = self.get_df()
         include_index = not isinstance(df.index, pd.RangeIndex)
-        return df.to_csv(index=include_index, **config.get('CSV_EXPORT'))
+        return utils.iter_df_to_csv(
+            df, index=include_index, **config.get('CSV_EXPORT'))
 
     def get_data(self, df):
         return []
@@ -577,7 +571,7 @@ class TableViz(BaseViz):
 
     def json_dumps(self, obj, sort_keys=False):
         if self.form_data.get('all_columns'):
-            return json.dumps(
+            return utils.json_dumps_fast(
                 obj, default=utils.json_iso_dttm_ser, sort_keys=sort_keys)
         else:
             return super(TableViz, self).json_dumps(obj)
@@ -1265,9 +1259,13 @@ class MultiLineViz(NVD3Viz):
         from superset.models.core import Slice
         from superset import db
         slice_ids1 = fd.get('line_charts')
-        slices1 = db.session.query(Slice).filter(Slice.id.in_(slice_ids1)).all()
         slice_ids2 = fd.get('line_charts_2')
-        slices2 = db.session.query(Slice).filter(Slice.id.in_(slice_ids2)).all()
+        # The second axis is often left empty, don't query for no slices
+        slices1 = slices2 = []
+        if slice_ids1:
+            slices1 = db.session.query(Slice).filter(Slice.id.in_(slice_ids1)).all()
+        if slice_ids2:
+            slices2 = db.session.query(Slice).filter(Slice.id.in_(slice_ids2)).all()
         return {
             'slices': {
                 'axis1': [slc.data for slc in slices1],
@@ -2045,7 +2043,9 @@ class DeckGLMultiLayer(BaseViz):
         from superset.models.core import Slice
         from superset import db
         slice_ids = fd.get('deck_slices')
-        slices = db.session.query(Slice).filter(Slice.id.in_(slice_ids)).all()
+        slices = []
+        if slice_ids:
+            slices = db.session.query(Slice).filter(Slice.id.in_(slice_ids)).all()
         return {
             'mapboxApiKey': config.get('MAPBOX_API_KEY'),
             'slices': [slc.data for slc in slices],
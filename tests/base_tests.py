@@ -5,7 +5,6 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-import json
 import logging
 import os
 import unittest
@@ -161,7 +160,7 @@ class SupersetTestCase(unittest.TestCase):
             self, url, data=None, follow_redirects=True, raise_on_error=True):
         """Shortcut to get the parsed results while following redirects"""
         resp = self.get_resp(url, data, follow_redirects, raise_on_error)
-        return json.loads(resp)
+        return utils.json_loads_fast(resp)
 
     def get_main_database(self, session):
         return (
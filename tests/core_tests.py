@@ -22,12 +22,16 @@ import psycopg2
 from six import text_type
 import sqlalchemy as sqla
 
-from superset import dataframe, db, jinja_context, security_manager, sql_lab, utils
+from superset import (
+    cache, dataframe, db, jinja_context, security_manager, sql_lab, utils,
+)
 from superset.connectors.sqla.models import SqlaTable
+from superset.connectors.sqla.views import TableModelView
 from superset.db_engine_specs import BaseEngineSpec
 from superset.models import core as models
 from superset.models.sql_lab import Query
 from superset.views.core import DatabaseView
+from superset.views.utils import bootstrap_user_data
 from .base_tests import SupersetTestCase
 
 
@@ -228,6 +232,56 @@ class CoreTests(SupersetTestCase):
         assert len(resp) > 0
         assert 'Carbon Dioxide' in resp
 
+    def test_filter_endpoint_cache(self):
+        self.login(username='admin')
+        tbl_id = self.table_ids.get('energy_usage')
+        resp = self.get_resp('/superset/filter/table/{}/target/'.format(tbl_id))
+        assert 'Carbon Dioxide' in resp
+        cache_key = 'superset/filter/{}__table/target'.format(tbl_id)
+        self.assertEqual(cache.get(cache_key), resp)
+
+    def test_bootstrap_user_data(self):
+        data = bootstrap_user_data('gamma', include_perms=True)
+        self.assertEqual(data['username'], 'gamma')
+        self.assertIn('Gamma', data['roles'])
+        self.assertIn(
+            ['can_list', 'SliceModelView'], data['roles']['Gamma'])
+        self.assertNotIn('roles', bootstrap_user_data('gamma'))
+
+    def test_cache_key_exist(self):
+        self.login(username='admin')
+        cache.set('test_cache_key_exist', 'some payload')
+        data = self.get_json_resp('/superset/cache_key_exist/test_cache_key_exist/')
+        self.assertEqual(data, {'key_exist': True})
+        resp = self.client.get('/superset/cache_key_exist/test_missing_key/')
+        self.assertEqual(resp.status_code, 404)
+
+    def test_select_star_cached(self):
+        from superset.views.utils import (
+            clear_select_star_cache, select_star_cache_key)
+        self.login(username='admin')
+        table = self.get_table_by_name('birth_names')
+        url = '/superset/select_star/{}/birth_names/'.format(table.database_id)
+        cache_key = select_star_cache_key(table.database_id, 'birth_names')
+        resp = self.get_resp(url)
+        self.assertIn('birth_names', resp)
+        self.assertIn('birth_names', cache.get(cache_key))
+
+        cache.set(cache_key, 'SELECT * FROM cached_birth_names')
+        self.assertIn('cached_birth_names', self.get_resp(url))
+        clear_select_star_cache(table)
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_select_star_cacheable(self):
+        from superset.views.utils import select_star_is_cacheable
+        for uri, cacheable in (
+                ('sqlite://', True),
+                ('mysql://localhost', True),
+                ('presto://localhost', False),
+                ('hive://localhost', False)):
+            database = models.Database(sqlalchemy_uri=uri)
+            self.assertEqual(select_star_is_cacheable(database), cacheable)
+
     def test_slice_data(self):
         # slice data should have some required attributes
         self.login(username='admin')
@@ -261,6 +315,36 @@ class CoreTests(SupersetTestCase):
         assert table.name in resp
         assert '/superset/explore/table/{}'.format(table.id) in resp
 
+    def test_tablemodelview_list_load_options(self):
+        db.session.expire_all()
+        count, tables = TableModelView.datamodel.query(page=0, page_size=10)
+        self.assertTrue(count)
+        for table in tables:
+            # loaded along with the page rather than on first access
+            self.assertIn('database', table.__dict__)
+            self.assertIn('changed_by', table.__dict__)
+
+    def test_tablemodelview_add_existing(self):
+        self.login(username='admin')
+        table = self.get_table_by_name('birth_names')
+        resp = self.get_resp('/tablemodelview/add', data={
+            'database': table.database_id,
+            'table_name': 'birth_names',
+        })
+        self.assertIn('already exists', resp)
+        self.assertEquals(
+            1, db.session.query(SqlaTable).filter_by(table_name='birth_names').count())
+
+    def test_tablemodelview_add_missing(self):
+        self.login(username='admin')
+        table = self.get_table_by_name('birth_names')
+        resp = self.get_resp('/tablemodelview/add', data={
+            'database': table.database_id,
+            'table_name': 'no_such_table',
+        })
+        self.assertIn('could not be found', resp)
+        self.assertIsNone(self.get_table_by_name('no_such_table'))
+
     def test_add_slice(self):
         self.login(username='admin')
         # assert that /slicemodelview/add responds with 200
@@ -446,6 +530,17 @@ class CoreTests(SupersetTestCase):
             '/superset/extra_table_metadata/{dbid}/'
             'ab_permission_view/panoramix/'.format(**locals()))
 
+    def test_tables_substr(self):
+        self.login('admin')
+        main_db = self.get_main_database(db.session)
+        schema = main_db.inspector.default_schema_name
+        data = self.get_json_resp(
+            '/superset/tables/{}/{}/birth_/'.format(main_db.id, schema))
+        values = [o['value'] for o in data['options']]
+        self.assertIn('birth_names', values)
+        self.assertTrue(all('birth_' in v for v in values))
+        self.assertEquals(data['tableLength'], len(values))
+
     def test_process_template(self):
         maindb = self.get_main_database(db.session)
         sql = "SELECT '{{ datetime(2017, 1, 1).isoformat() }}'"
@@ -493,6 +588,18 @@ class CoreTests(SupersetTestCase):
             elif backend == 'postgresql':
                 self.assertEqual(len(data.get('indexes')), 5)
 
+    def test_table_metadata_conditional(self):
+        self.login('admin')
+        maindb = self.get_main_database(db.session)
+        url = '/superset/table/{}/ab_user/null/'.format(maindb.id)
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertIn('private', resp.headers['Cache-Control'])
+        etag = resp.headers['ETag']
+
+        resp = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+
     def test_fetch_datasource_metadata(self):
         self.login(username='admin')
         url = (
@@ -508,6 +615,19 @@ class CoreTests(SupersetTestCase):
         for k in keys:
             self.assertIn(k, resp.keys())
 
+    def test_favstar(self):
+        self.login(username='admin')
+        slc = self.get_slice('Girls', db.session)
+        url = '/superset/favstar/Slice/{}/{{}}/'.format(slc.id)
+
+        self.assertEqual(self.get_json_resp(url.format('select'))['count'], 1)
+        # Selecting twice doesn't add a second star
+        self.assertEqual(self.get_json_resp(url.format('select'))['count'], 1)
+        self.assertEqual(self.get_json_resp(url.format('count'))['count'], 1)
+
+        self.get_json_resp(url.format('unselect'))
+        self.assertEqual(self.get_json_resp(url.format('count'))['count'], 0)
+
     def test_user_profile(self, username='admin'):
         self.login(username=username)
         slc = self.get_slice('Girls', db.session)
@@ -534,6 +654,10 @@ class CoreTests(SupersetTestCase):
         self.assertNotIn('message', data)
         data = self.get_json_resp('/superset/created_slices/{}/'.format(userid))
         self.assertNotIn('message', data)
+        for item in data:
+            slc = db.session.query(models.Slice).get(item['id'])
+            self.assertEqual(slc.slice_url, item['url'])
+            self.assertEqual(slc.slice_name, item['title'])
         data = self.get_json_resp('/superset/created_dashboards/{}/'.format(userid))
         self.assertNotIn('message', data)
         data = self.get_json_resp('/superset/fave_slices/{}/'.format(userid))
@@ -697,6 +821,57 @@ class CoreTests(SupersetTestCase):
         self.assertEqual(data['status'], None)
         self.assertEqual(data['error'], None)
 
+    def test_muldelete(self):
+        self.login(username='admin')
+        templates = [
+            models.CssTemplate(template_name='muldelete_{}'.format(i))
+            for i in range(3)
+        ]
+        db.session.add_all(templates)
+        db.session.commit()
+        ids = [t.id for t in templates]
+
+        self.get_resp(
+            '/csstemplatemodelview/action_post',
+            data={'action': 'muldelete', 'rowid': ids})
+        remaining = (
+            db.session.query(models.CssTemplate)
+            .filter(models.CssTemplate.id.in_(ids))
+            .count()
+        )
+        self.assertEqual(remaining, 0)
+
+    def test_datasources(self):
+        self.login(username='admin')
+        names = [o['name'] for o in self.get_json_resp('/superset/datasources/')]
+        assert 'birth_names' in names
+        self.assertEqual(names, sorted(names))
+
+        # Adding a datasource has to show up despite the list being cached
+        table = SqlaTable(
+            table_name='test_datasources_cache',
+            database=self.get_main_database(db.session))
+        db.session.add(table)
+        db.session.commit()
+        names = [o['name'] for o in self.get_json_resp('/superset/datasources/')]
+        assert 'test_datasources_cache' in names
+
+        db.session.delete(table)
+        db.session.commit()
+        names = [o['name'] for o in self.get_json_resp('/superset/datasources/')]
+        assert 'test_datasources_cache' not in names
+
+    def test_datasources_etag(self):
+        self.login(username='admin')
+        resp = self.client.get('/superset/datasources/')
+        etag = resp.headers['ETag']
+        self.assertEqual(resp.status_code, 200)
+
+        resp = self.client.get(
+            '/superset/datasources/', headers={'If-None-Match': etag})
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp.data, b'')
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -5,10 +5,12 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from collections import defaultdict
 import json
 import unittest
 
 from flask import escape
+from sqlalchemy import event
 
 from superset import db, security_manager
 from superset.connectors.sqla.models import SqlaTable
@@ -25,7 +27,11 @@ class DashboardTests(SupersetTestCase):
 
     @classmethod
     def setUpClass(cls):
-        pass
+        # The example dashboards keep their ids, look them up by slug once
+        # and by primary key in the tests
+        cls.dash_ids = dict(
+            db.session.query(models.Dashboard.slug, models.Dashboard.id)
+            .filter(models.Dashboard.slug.in_(['births', 'world_health'])))
 
     def setUp(self):
         pass
@@ -33,21 +39,62 @@ class DashboardTests(SupersetTestCase):
     def tearDown(self):
         pass
 
+    def get_dash(self, slug):
+        return db.session.query(models.Dashboard).get(self.dash_ids[slug])
+
     def test_dashboard(self):
         self.login(username='admin')
         urls = {}
         for dash in db.session.query(models.Dashboard).all():
             urls[dash.dashboard_title] = dash.url
         for title, url in urls.items():
-            assert escape(title) in self.client.get(url).data.decode('utf-8')
+            assert escape(title).encode('utf-8') in self.client.get(url).data
+
+    def test_dashboard_list_load_options(self):
+        from superset.views.core import DashboardModelView
+        db.session.expire_all()
+        count, dashboards = DashboardModelView.datamodel.query(
+            page=0, page_size=10)
+        self.assertTrue(count)
+        for dash in dashboards:
+            self.assertNotIn('position_json', dash.__dict__)
+            self.assertIn('created_by', dash.__dict__)
+        # deferred columns still load on access
+        self.assertIsInstance(dashboards[0].position_array, list)
+
+    def test_dashboard_datasources(self):
+        dash = self.get_dash('births')
+        datasource_ids = defaultdict(set)
+        for slc in dash.slices:
+            datasource_ids[slc.cls_model].add(slc.datasource_id)
+
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', count_statement)
+        try:
+            datasources = dash.datasources
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count_statement)
+        # One query per datasource type rather than one per slice, plus one
+        # each for their columns and metrics
+        self.assertTrue(statements)
+        self.assertLessEqual(len(statements), 3 * len(datasource_ids))
+        self.assertLess(len(datasource_ids), len(dash.slices))
+
+        expected = set()
+        for cls_model, ids in datasource_ids.items():
+            expected.update(
+                db.session.query(cls_model).filter(cls_model.id.in_(ids)))
+        self.assertEquals(datasources, expected)
+        self.assertIn(
+            'birth_names', [ds.table_name for ds in datasources])
 
     def test_dashboard_modes(self):
         self.login(username='admin')
-        dash = (
-            db.session.query(models.Dashboard)
-            .filter_by(slug='births')
-            .first()
-        )
+        dash = self.get_dash('births')
         url = dash.url
         if dash.url.find('?') == -1:
             url += '?'
@@ -59,8 +106,7 @@ class DashboardTests(SupersetTestCase):
 
     def test_save_dash(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         data = {
             'css': '',
             'expanded_slices': {},
@@ -73,8 +119,7 @@ class DashboardTests(SupersetTestCase):
 
     def test_save_dash_with_filter(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='world_health').first()
+        dash = self.get_dash('world_health')
 
         filters = {str(dash.slices[0].id): {'region': ['North America']}}
         default_filters = json.dumps(filters)
@@ -90,8 +135,7 @@ class DashboardTests(SupersetTestCase):
         resp = self.get_resp(url, data=dict(data=json.dumps(data)))
         self.assertIn('SUCCESS', resp)
 
-        updatedDash = db.session.query(models.Dashboard).filter_by(
-            slug='world_health').first()
+        updatedDash = self.get_dash('world_health')
         new_url = updatedDash.url
         self.assertIn('region', new_url)
 
@@ -100,8 +144,7 @@ class DashboardTests(SupersetTestCase):
 
     def test_save_dash_with_invalid_filters(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='world_health').first()
+        dash = self.get_dash('world_health')
 
         # add an invalid filter slice
         filters = {str(99999): {'region': ['North America']}}
@@ -118,18 +161,13 @@ class DashboardTests(SupersetTestCase):
         resp = self.get_resp(url, data=dict(data=json.dumps(data)))
         self.assertIn('SUCCESS', resp)
 
-        updatedDash = db.session.query(models.Dashboard).filter_by(
-            slug='world_health').first()
+        updatedDash = self.get_dash('world_health')
         new_url = updatedDash.url
         self.assertNotIn('region', new_url)
 
     def test_save_dash_with_dashboard_title(self, username='admin'):
         self.login(username=username)
-        dash = (
-            db.session.query(models.Dashboard)
-            .filter_by(slug='births')
-            .first()
-        )
+        dash = self.get_dash('births')
         origin_title = dash.dashboard_title
         data = {
             'css': '',
@@ -139,11 +177,7 @@ class DashboardTests(SupersetTestCase):
         }
         url = '/superset/save_dash/{}/'.format(dash.id)
         self.get_resp(url, data=dict(data=json.dumps(data)))
-        updatedDash = (
-            db.session.query(models.Dashboard)
-            .filter_by(slug='births')
-            .first()
-        )
+        updatedDash = self.get_dash('births')
         self.assertEqual(updatedDash.dashboard_title, 'new title')
         # bring back dashboard original title
         data['dashboard_title'] = origin_title
@@ -151,8 +185,7 @@ class DashboardTests(SupersetTestCase):
 
     def test_copy_dash(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         data = {
             'css': '',
             'duplicate_slices': False,
@@ -184,8 +217,7 @@ class DashboardTests(SupersetTestCase):
 
     def test_add_slices(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         new_slice = db.session.query(models.Slice).filter_by(
             slice_name='Mapbox Long/Lat').first()
         existing_slice = db.session.query(models.Slice).filter_by(
@@ -198,24 +230,21 @@ class DashboardTests(SupersetTestCase):
         resp = self.client.post(url, data=dict(data=json.dumps(data)))
         assert 'SLICES ADDED' in resp.data.decode('utf-8')
 
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         new_slice = db.session.query(models.Slice).filter_by(
             slice_name='Mapbox Long/Lat').first()
         assert new_slice in dash.slices
         assert len(set(dash.slices)) == len(dash.slices)
 
         # cleaning up
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         dash.slices = [
             o for o in dash.slices if o.slice_name != 'Mapbox Long/Lat']
         db.session.commit()
 
     def test_remove_slices(self, username='admin'):
         self.login(username=username)
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         positions = dash.position_array[:-1]
         origin_slices_length = len(dash.slices)
 
@@ -256,21 +285,18 @@ class DashboardTests(SupersetTestCase):
 
         self.grant_public_access_to_table(table)
 
-        # Try access after adding appropriate permissions.
-        self.assertIn('birth_names', self.get_resp('/slicemodelview/list/'))
-
-        resp = self.get_resp('/dashboardmodelview/list/')
-        self.assertIn('/superset/dashboard/births/', resp)
-
-        self.assertIn('Births', self.get_resp('/superset/dashboard/births/'))
-
-        # Confirm that public doesn't have access to other datasets.
+        # Try access after adding appropriate permissions, and confirm that
+        # public doesn't have access to other datasets.
         resp = self.get_resp('/slicemodelview/list/')
+        self.assertIn('birth_names', resp)
         self.assertNotIn('wb_health_population</a>', resp)
 
         resp = self.get_resp('/dashboardmodelview/list/')
+        self.assertIn('/superset/dashboard/births/', resp)
         self.assertNotIn('/superset/dashboard/world_health/', resp)
 
+        self.assertIn('Births', self.get_resp('/superset/dashboard/births/'))
+
     def test_dashboard_with_created_by_can_be_accessed_by_public_users(self):
         self.logout()
         table = (
@@ -281,8 +307,7 @@ class DashboardTests(SupersetTestCase):
         )
         self.grant_public_access_to_table(table)
 
-        dash = db.session.query(models.Dashboard).filter_by(
-            slug='births').first()
+        dash = self.get_dash('births')
         dash.owners = [security_manager.find_user('admin')]
         dash.created_by = security_manager.find_user('admin')
         db.session.merge(dash)
@@ -291,12 +316,7 @@ class DashboardTests(SupersetTestCase):
         assert 'Births' in self.get_resp('/superset/dashboard/births/')
 
     def test_only_owners_can_save(self):
-        dash = (
-            db.session
-            .query(models.Dashboard)
-            .filter_by(slug='births')
-            .first()
-        )
+        dash = self.get_dash('births')
         dash.owners = []
         db.session.merge(dash)
         db.session.commit()
@@ -308,12 +328,7 @@ class DashboardTests(SupersetTestCase):
 
         alpha = security_manager.find_user('alpha')
 
-        dash = (
-            db.session
-            .query(models.Dashboard)
-            .filter_by(slug='births')
-            .first()
-        )
+        dash = self.get_dash('births')
         dash.owners = [alpha]
         db.session.merge(dash)
         db.session.commit()
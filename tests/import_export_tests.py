@@ -5,9 +5,11 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import io
 import json
 import unittest
 
+from mock import patch
 from sqlalchemy.orm.session import make_transient
 
 from superset import db, utils
@@ -315,6 +317,31 @@ class ImportExportTests(SupersetTestCase):
         self.assert_dash_equals(
             empty_dash, imported_dash, check_position=False)
 
+    def test_import_dashboards_rolls_back_on_failure(self):
+        table = self.create_table('failed_import_table', id=10300)
+        dash = self.create_dashboard('failed_import_dash', id=10301)
+        payload = json.dumps(
+            {'dashboards': [dash], 'datasources': [table]},
+            cls=utils.DashboardEncoder)
+        self.login(username='admin')
+        with patch.object(
+                models.Dashboard, 'import_obj',
+                side_effect=ValueError('Broken dashboard')):
+            with self.assertRaises(ValueError):
+                self.client.post(
+                    '/superset/import_dashboards',
+                    data={
+                        'file': (
+                            io.BytesIO(payload.encode('utf-8')),
+                            'dashboards.json'),
+                    },
+                    content_type='multipart/form-data')
+        # The table imported ahead of the dashboard isn't left behind
+        self.assertIsNone(
+            db.session.query(SqlaTable)
+            .filter_by(table_name='failed_import_table')
+            .first())
+
     def test_import_dashboard_1_slice(self):
         slc = self.create_slice('health_slc', id=10006)
         dash_with_1_slice = self.create_dashboard(
@@ -4,6 +4,9 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+from flask import g
+from mock import patch
+
 from superset import app, security_manager
 from .base_tests import SupersetTestCase
 
@@ -175,3 +178,48 @@ class RolePermissionTests(SupersetTestCase):
 
         self.assert_cannot_gamma(granter_set)
         self.assert_cannot_alpha(granter_set)
+
+    def test_view_access(self):
+        user = security_manager.find_user('gamma')
+        with app.test_request_context():
+            view_access = security_manager._view_access(user)
+            self.assertTrue(get_perm_tuples('Gamma').issubset(view_access))
+            self.assertTrue(security_manager.can_access(
+                'can_explore', 'Superset', user=user))
+            self.assertFalse(security_manager.can_access(
+                'can_approve', 'Superset', user=user))
+
+    def test_can_access_memoized_per_request(self):
+        user = security_manager.find_user('gamma')
+        with app.test_request_context():
+            with patch.object(
+                    security_manager, '_view_access',
+                    wraps=security_manager._view_access) as view_access:
+                self.assertTrue(security_manager.can_access(
+                    'can_explore', 'Superset', user=user))
+                self.assertTrue(security_manager.can_access(
+                    'can_explore', 'Superset', user=user))
+                self.assertEqual(view_access.call_count, 1)
+            self.assertIn(
+                (user.get_id(), 'can_explore', 'Superset'), g._access_cache)
+            # the permissions are fetched once for all the checks
+            self.assertIs(
+                security_manager._view_access(user),
+                security_manager._view_access(user))
+
+    def test_can_access_not_shared_across_requests_or_users(self):
+        admin = security_manager.find_user('admin')
+        gamma = security_manager.find_user('gamma')
+        with app.test_request_context():
+            self.assertTrue(security_manager.can_access(
+                'can_approve', 'Superset', user=admin))
+        with app.test_request_context():
+            self.assertIsNone(getattr(g, '_access_cache', None))
+            self.assertIsNone(getattr(g, '_view_access_cache', None))
+            self.assertFalse(security_manager.can_access(
+                'can_approve', 'Superset', user=gamma))
+        with app.test_request_context():
+            self.assertFalse(security_manager.can_access(
+                'can_approve', 'Superset', user=gamma))
+            self.assertTrue(security_manager.can_access(
+                'can_approve', 'Superset', user=admin))
@@ -292,6 +292,14 @@ class SupersetTestCase(unittest.TestCase):
         """
         self.assertEquals({'src'}, self.extract_tables(query))
 
+    def test_parsed_lazily(self):
+        sq = sql_parse.SupersetQuery('SELECT * FROM tbname;\n')
+        self.assertEquals('SELECT * FROM tbname', sq.stripped())
+        self.assertIsNone(sq._parsed)
+        self.assertTrue(sq.is_select())
+        self.assertEquals({'tbname'}, sq.tables)
+        self.assertEquals({'tbname'}, sq.tables)
+
     def multistatement(self):
         query = 'SELECT * FROM t1; SELECT * FROM t2'
         self.assertEquals({'t1', 't2'}, self.extract_tables(query))
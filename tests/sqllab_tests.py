@@ -122,6 +122,39 @@ class SqlLabTests(SupersetTestCase):
         # Redirects to the login page
         self.assertEquals(403, resp.status_code)
 
+    def test_queries_endpoint_timeout(self):
+        self.run_some_queries()
+        query = db.session.query(Query).filter_by(client_id='client_id_1').one()
+        query.status = utils.QueryStatus.RUNNING
+        query.start_time = utils.now_as_float() - 10 ** 10
+        db.session.commit()
+
+        self.login('admin')
+        data = self.get_json_resp('/superset/queries/0')
+        self.assertEquals(
+            utils.QueryStatus.TIMED_OUT, data['client_id_1']['state'])
+        db.session.expire_all()
+        query = db.session.query(Query).filter_by(client_id='client_id_1').one()
+        self.assertEquals(utils.QueryStatus.TIMED_OUT, query.status)
+
+    def test_stop_query(self):
+        self.run_some_queries()
+        self.login('admin')
+        self.client.post('/superset/stop_query/', data={'client_id': 'client_id_1'})
+        db.session.expire_all()
+        query = db.session.query(Query).filter_by(client_id='client_id_1').one()
+        self.assertEquals(utils.QueryStatus.STOPPED, query.status)
+
+    def test_get_query_by(self):
+        from superset.views.core import get_query_by
+        self.run_some_queries()
+        for client_id in ('client_id_1', 'client_id_3'):
+            query = get_query_by(Query.client_id, client_id)
+            self.assertEquals(client_id, query.client_id)
+            if query.results_key:
+                self.assertEquals(
+                    query.id, get_query_by(Query.results_key, query.results_key).id)
+
     def test_search_query_on_db_id(self):
         self.run_some_queries()
         self.login('admin')
@@ -23,12 +23,18 @@ PUBLIC_ROLE_LIKE_GAMMA = True
 AUTH_ROLE_PUBLIC = 'Public'
 EMAIL_NOTIFICATIONS = False
 
-CACHE_CONFIG = {'CACHE_TYPE': 'simple'}
+CACHE_CONFIG = {
+    'CACHE_TYPE': 'simple',
+    'CACHE_THRESHOLD': 500,
+    'CACHE_DEFAULT_TIMEOUT': 60,
+}
 
 class CeleryConfig(object):
     BROKER_URL = 'redis://localhost'
     CELERY_IMPORTS = ('superset.sql_lab', )
-    CELERY_RESULT_BACKEND = 'db+sqlite:///' + SQL_CELERY_RESULTS_DB_FILE_PATH
+    # SQL Lab tracks its queries in the Query table, nothing reads the
+    # task results back, keep them in the worker's memory
+    CELERY_RESULT_BACKEND = 'cache+memory://'
     CELERY_ANNOTATIONS = {'sql_lab.add': {'rate_limit': '10/s'}}
     CONCURRENCY = 1
 
@@ -6,17 +6,23 @@ from __future__ import unicode_literals
 
 from datetime import date, datetime, time, timedelta
 from decimal import Decimal
+import json
+import math
 import unittest
 import uuid
 
 from mock import patch
 import numpy
+import pandas as pd
+import pytz
 
 from superset.exceptions import SupersetException
 from superset.utils import (
-    base_json_conv, datetime_f, json_int_dttm_ser, json_iso_dttm_ser,
-    JSONEncodedDict, memoized, merge_extra_filters, merge_request_params,
-    parse_human_timedelta, validate_json, zlib_compress, zlib_decompress_to_string,
+    base_json_conv, datetime_f, iter_df_to_csv, json_dumps_fast,
+    json_int_dttm_ser, json_iso_dttm_ser, json_loads_fast, JSONEncodedDict, memoized,
+    merge_extra_filters,
+    merge_request_params, parse_human_timedelta, validate_json, zlib_compress,
+    zlib_decompress_to_string,
 )
 
 
@@ -29,6 +35,7 @@ class UtilsTestCase(unittest.TestCase):
         assert json_int_dttm_ser(datetime(1970, 1, 1)) == 0
         assert json_int_dttm_ser(date(1970, 1, 1)) == 0
         assert json_int_dttm_ser(dttm + timedelta(milliseconds=1)) == (ts + 1)
+        assert json_int_dttm_ser(pytz.utc.localize(dttm)) == ts
 
         with self.assertRaises(TypeError):
             json_int_dttm_ser('this is not a date')
@@ -51,6 +58,76 @@ class UtilsTestCase(unittest.TestCase):
         assert isinstance(base_json_conv(Decimal('1.0')), float) is True
         assert isinstance(base_json_conv(uuid.uuid4()), str) is True
 
+    def test_json_dumps_fast(self):
+        payload = {
+            'dttm': datetime(2020, 1, 1),
+            'nan': float('nan'),
+            'int': numpy.int64(1),
+            1: set([3]),
+        }
+        self.assertEquals(json.loads(json_dumps_fast(payload)), {
+            'dttm': 1577836800000.0,
+            'nan': None,
+            'int': 1,
+            '1': [3],
+        })
+        self.assertEquals(
+            json_dumps_fast({'b': 1, 'a': 2}, sort_keys=True).replace(' ', ''),
+            '{"a":2,"b":1}')
+        self.assertEquals(
+            json.loads(json_dumps_fast(
+                {'dttm': datetime(2020, 1, 1)}, default=json_iso_dttm_ser)),
+            {'dttm': '2020-01-01T00:00:00'})
+        dttm = datetime(2020, 1, 2, 3, 4, 5, 120)
+        values = [dttm, dttm.date(), dttm.time(), pd.Timestamp(dttm)]
+        self.assertEquals(
+            json.loads(json_dumps_fast(values, default=json_iso_dttm_ser)),
+            [json_iso_dttm_ser(v) for v in values])
+        self.assertEquals(
+            json.loads(json_dumps_fast(
+                {'raw': b'\xff'}, default=lambda o: 'bytes', encoding=None)),
+            {'raw': 'bytes'})
+        raw = json_dumps_fast({'a': 'é'}, raw=True)
+        if not isinstance(raw, bytes):
+            raw = raw.encode('utf-8')
+        self.assertEquals(json.loads(raw.decode('utf-8')), {'a': 'é'})
+
+    def test_json_dumps_fast_backends_agree(self):
+        payload = {
+            'bytes': b'abc',
+            'nan': float('nan'),
+            'dttm': datetime(2020, 1, 2, 3, 4, 5),
+            'date': date(2020, 1, 2),
+            'int': numpy.int64(3),
+            'bool': numpy.bool_(True),
+            'float': numpy.float64(1.5),
+        }
+        for default in (json_int_dttm_ser, json_iso_dttm_ser):
+            fast = json.loads(json_dumps_fast(payload, default=default))
+            with patch('superset.utils.orjson', None):
+                slow = json.loads(json_dumps_fast(payload, default=default))
+            self.assertEquals(fast, slow)
+            self.assertEquals(fast['bytes'], 'abc')
+            self.assertIsNone(fast['nan'])
+
+    def test_json_loads_fast(self):
+        self.assertEquals(
+            json_loads_fast('{"a": [1, 2.5, null]}'), {'a': [1, 2.5, None]})
+        self.assertEquals(json_loads_fast(b'{"a": 1}'), {'a': 1})
+        self.assertTrue(math.isnan(json_loads_fast('{"a": NaN}')['a']))
+        self.assertEquals(json_loads_fast('[18446744073709551616]'), [2 ** 64])
+
+    def test_iter_df_to_csv(self):
+        df = pd.DataFrame({'a': range(25), 'b': ['x'] * 25})
+        chunks = list(iter_df_to_csv(df, chunksize=10, index=False))
+        self.assertEquals(len(chunks), 3)
+        self.assertEquals(''.join(chunks), df.to_csv(index=False))
+
+        empty_df = df[df.a < 0]
+        self.assertEquals(
+            ''.join(iter_df_to_csv(empty_df, index=False)),
+            empty_df.to_csv(index=False))
+
     @patch('superset.utils.datetime')
     def test_parse_human_timedelta(self, mock_now):
         mock_now.return_value = datetime(2016, 12, 1)
@@ -949,3 +949,15 @@ class BaseDeckGLVizTestCase(unittest.TestCase):
         assert results['metrics'] == []
         assert results['groupby'] == []
         assert results['columns'] == ['test_col']
+
+
+class MultiLineVizTestCase(unittest.TestCase):
+
+    @patch('superset.db')
+    def test_get_data_skips_empty_axis(self, db):
+        datasource = {'type': 'table'}
+        form_data = {'line_charts': [], 'line_charts_2': []}
+        test_viz = viz.MultiLineViz(datasource, form_data)
+        data = test_viz.get_data(None)
+        self.assertEqual({'axis1': [], 'axis2': []}, data['slices'])
+        db.session.query.assert_not_called()